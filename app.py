@@ -287,7 +287,7 @@ def api_analyze_risks():
 def api_build_graph():
     """API endpoint to build the knowledge graph."""
     try:
-        graph_builder.build_complete_graph()
+        graph_builder.build_complete_graph(force=True)
         return jsonify({"status": "success", "message": "Built knowledge graph"})
     except Exception as e:
         logger.error(f"Error building graph: {e}")
@@ -360,15 +360,32 @@ def api_query_graph():
         results = {}
         
         if query_type == 'entity_search':
-            results = graph_builder.search_entities(params.get('term', ''))
+            results = [hit._asdict() for hit in graph_builder.search_entities(params.get('term', ''))]
         elif query_type == 'event_search':
-            results = graph_builder.search_events(params.get('term', ''))
+            results = [hit._asdict() for hit in graph_builder.search_events(params.get('term', ''))]
+        elif query_type == 'event_search_multi':
+            results = {
+                term: [hit._asdict() for hit in hits]
+                for term, hits in graph_builder.search_events_multi(params.get('terms', [])).items()
+            }
         elif query_type == 'risk_search':
-            results = graph_builder.search_risks(params.get('term', ''))
+            results = [hit._asdict() for hit in graph_builder.search_risks(params.get('term', ''))]
         elif query_type == 'centrality':
             results = graph_builder.analyze_centrality(params.get('measure', 'degree'))
         elif query_type == 'community':
-            results = graph_builder.detect_communities(params.get('method', 'louvain'))
+            # top_k may be null for all communities, otherwise a positive integer
+            top_k = params.get('top_k', 50)
+            if top_k is not None:
+                try:
+                    top_k = int(top_k)
+                except (TypeError, ValueError):
+                    top_k = 0
+                if top_k < 1:
+                    return jsonify({"status": "error", "message": "top_k must be a positive integer"}), 400
+            results = graph_builder.detect_communities(
+                params.get('method', 'louvain'),
+                top_k
+            )
         elif query_type == 'path':
             results = graph_builder.find_paths(
                 params.get('source_id'), 
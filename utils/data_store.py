@@ -4,7 +4,7 @@ Data storage module for the Financial Risk Knowledge Graph system.
 import logging
 import json
 import os
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Iterable, Optional, Union
 from datetime import datetime
 import copy
 
@@ -41,6 +41,18 @@ class DataStore:
         self.news = {}
         self.relationships = {}
         
+        # News ID by URL, for duplicate checks during collection
+        self._news_url_index = {}
+        
+        # Revision counters, bumped on every save so caches can detect changes
+        self.revisions = {
+            "entities": 0,
+            "relationships": 0,
+            "events": 0,
+            "risks": 0,
+            "news": 0
+        }
+        
         # Create data directory if it doesn't exist
         for file_path in [entity_file, event_file, risk_file, news_file, graph_file]:
             directory = os.path.dirname(file_path)
@@ -262,6 +274,7 @@ class DataStore:
         Load news items from JSON file.
         """
         self.news = {}
+        self._news_url_index = {}
         
         if os.path.exists(self.news_file):
             try:
@@ -300,6 +313,7 @@ class DataStore:
                                 collected_at=datetime.fromisoformat(news_data.get("collected_at", datetime.now().isoformat()))
                             )
                             self.news[news_id] = news_item
+                            self._news_url_index.setdefault(news_item.url, news_id)
                         except KeyError as ke:
                             logger.warning(f"Missing required field in news data: {ke}")
                         except ValueError as ve:
@@ -401,6 +415,7 @@ class DataStore:
         """
         # Update entity in memory
         self.entities[entity.id] = entity
+        self.revisions["entities"] += 1
         
         # Save to file
         self._save_entities()
@@ -417,6 +432,19 @@ class DataStore:
         """
         return self.entities.get(entity_id)
     
+    def get_entities(self, entity_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several entities by ID in one call.
+        
+        Args:
+            entity_ids: Entity IDs
+            
+        Returns:
+            Dictionary mapping the IDs that were found to their entity objects
+        """
+        entities = self.entities
+        return {entity_id: entities[entity_id] for entity_id in entity_ids if entity_id in entities}
+    
     def get_all_entities(self) -> List[Any]:
         """
         Get all entities.
@@ -466,6 +494,7 @@ class DataStore:
         """
         # Update relationship in memory
         self.relationships[relationship.id] = relationship
+        self.revisions["relationships"] += 1
         
         # Save to file
         self._save_entities()
@@ -516,6 +545,7 @@ class DataStore:
         """
         # Update event in memory
         self.events[event.id] = event
+        self.revisions["events"] += 1
         
         # Save to file
         self._save_events()
@@ -532,6 +562,19 @@ class DataStore:
         """
         return self.events.get(event_id)
     
+    def get_events(self, event_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several events by ID in one call.
+        
+        Args:
+            event_ids: Event IDs
+            
+        Returns:
+            Dictionary mapping the IDs that were found to their event objects
+        """
+        events = self.events
+        return {event_id: events[event_id] for event_id in event_ids if event_id in events}
+    
     def get_all_events(self) -> List[Any]:
         """
         Get all events.
@@ -565,6 +608,27 @@ class DataStore:
         """
         # Update risk in memory
         self.risks[risk.id] = risk
+        self.revisions["risks"] += 1
+        
+        # Save to file
+        self._save_risks()
+    
+    def save_risks(self, risks: List[Any]) -> None:
+        """
+        Save a batch of risks to the data store.
+        
+        The risk file is written once for the whole batch.
+        
+        Args:
+            risks: Risk objects to save
+        """
+        if not risks:
+            return
+        
+        # Update risks in memory
+        for risk in risks:
+            self.risks[risk.id] = risk
+        self.revisions["risks"] += 1
         
         # Save to file
         self._save_risks()
@@ -615,10 +679,48 @@ class DataStore:
         """
         # Update news in memory
         self.news[news.id] = news
+        self.revisions["news"] += 1
+        self._news_url_index.setdefault(news.url, news.id)
         
         # Save to file
         self._save_news()
     
+    def save_news_bulk(self, news_items: List[Any]) -> List[str]:
+        """
+        Save a batch of news items, skipping duplicates by URL.
+        
+        The news file is written once for the whole batch.
+        
+        Args:
+            news_items: NewsItem objects to save
+            
+        Returns:
+            List of news IDs, one per item; duplicates get the ID of the stored item
+        """
+        news_ids = []
+        added = False
+        
+        for news in news_items:
+            existing = self.find_news_by_url(news.url)
+            if existing:
+                logger.info("Skipping duplicate news: %s", news.title)
+                news_ids.append(existing.id)
+                continue
+            
+            # Update news in memory
+            self.news[news.id] = news
+            self._news_url_index.setdefault(news.url, news.id)
+            news_ids.append(news.id)
+            added = True
+        
+        if added:
+            self.revisions["news"] += 1
+            
+            # Save to file
+            self._save_news()
+        
+        return news_ids
+    
     def get_news(self, news_id: str) -> Optional[Any]:
         """
         Get a news item by ID.
@@ -668,7 +770,15 @@ class DataStore:
         Returns:
             NewsItem object or None if not found
         """
-        for news in self.news.values():
-            if news.url == url:
-                return news
-        return None
+        news = self.news.get(self._news_url_index.get(url))
+        if news is not None and news.url == url:
+            return news
+        
+        # Fall back to a scan if the indexed item's URL has changed
+        if news is not None:
+            self._news_url_index = {}
+            for item in self.news.values():
+                self._news_url_index.setdefault(item.url, item.id)
+            news = self.news.get(self._news_url_index.get(url))
+        
+        return news
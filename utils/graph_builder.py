@@ -3,14 +3,330 @@ Knowledge graph builder for constructing the financial risk knowledge graph.
 """
 import logging
 import networkx as nx
-from typing import List, Dict, Any, Optional, Set, Tuple
+import numpy as np
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+from scipy.sparse.linalg import eigsh
+from typing import List, Dict, Any, NamedTuple, Optional, Set, Tuple
+import bisect
+import copy
+import functools
 import json
-import community as community_louvain
+import os
 from datetime import datetime
+from utils import graph_kernels
+
+# Aho-Corasick automaton for multi-term search, if installed
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Combined graph layer of each layer edge kind
+_EVENT_EDGE_LAYERS = {
+    "event_to_event": "event",
+    "event_to_entity": "event_to_entity"
+}
+_RISK_EDGE_LAYERS = {
+    "risk_to_risk": "risk",
+    "risk_to_entity": "risk_to_entity",
+    "event_to_risk": "event_to_risk"
+}
+
+class EntityHit(NamedTuple):
+    """
+    Entity search result.
+    """
+    id: str
+    name: str
+    type: str
+    subtype: Optional[str]
+    mentions: int
+
+
+class EventHit(NamedTuple):
+    """
+    Event search result.
+    """
+    id: str
+    title: str
+    description: str
+    type: str
+    date: str
+    entities: int
+
+
+class RiskHit(NamedTuple):
+    """
+    Risk search result.
+    """
+    id: str
+    title: str
+    description: str
+    type: str
+    severity: int
+    likelihood: float
+
+
+class _NodeTable:
+    """
+    Column-oriented attribute table for the nodes of one graph layer.
+    """
+    
+    def __init__(self, ids: List[str], columns: Dict[str, List[Any]]):
+        """
+        Initialize the table from parallel columns.
+        
+        Args:
+            ids: Node IDs, one per row
+            columns: Attribute columns, each aligned with ids
+        """
+        self.ids = ids
+        self.columns = columns
+        self.index = {node_id: i for i, node_id in enumerate(ids)}
+    
+    def rows(self, node_ids) -> List[int]:
+        """
+        Get the row numbers of the given node IDs.
+        
+        Args:
+            node_ids: Iterable of node IDs in the table
+            
+        Returns:
+            List of row numbers
+        """
+        index = self.index
+        return [index[node_id] for node_id in node_ids]
+    
+    def extend(self, ids: List[str], columns: Dict[str, List[Any]]) -> None:
+        """
+        Append rows to the table.
+        
+        Args:
+            ids: Node IDs of the new rows
+            columns: Attribute columns of the new rows, each aligned with ids
+        """
+        start = len(self.ids)
+        self.ids.extend(ids)
+        for name, column in self.columns.items():
+            column.extend(columns[name])
+        self.index.update((node_id, start + i) for i, node_id in enumerate(ids))
+
+
+class _SearchIndex:
+    """
+    Trigram index for case-insensitive substring search over text fields.
+    
+    Candidates are the documents containing every trigram of the search
+    term; each candidate is then verified with a plain substring test.
+    Terms too short to have trigrams are found with str.find over a single
+    NUL-separated corpus of all documents instead of one test per document.
+    """
+    
+    def __init__(self, items: List[Any], fields: List[Tuple[str, ...]]):
+        """
+        Build the index.
+        
+        Args:
+            items: Indexed objects, one per document
+            fields: Searchable text fields of each document
+        """
+        self.items = items
+        self.texts = [tuple(text.lower() for text in doc_fields) for doc_fields in fields]
+        self.postings = {}
+        
+        for i, texts in enumerate(self.texts):
+            grams = set()
+            for text in texts:
+                grams.update(text[k:k + 3] for k in range(len(text) - 2))
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(i)
+        
+        # Concatenated corpus with the start offset of each document
+        self.offsets = []
+        parts = []
+        position = 0
+        for texts in self.texts:
+            self.offsets.append(position)
+            part = "\0".join(texts) + "\0"
+            parts.append(part)
+            position += len(part)
+        self.corpus = "".join(parts)
+    
+    def search(self, term: str) -> List[Tuple[Any, Tuple[str, ...]]]:
+        """
+        Find the documents containing a term.
+        
+        Args:
+            term: Lowercased search term
+            
+        Returns:
+            (object, lowercased fields) pairs of the matches, in index order
+        """
+        if len(term) < 3:
+            if term and "\0" not in term:
+                return [(self.items[i], self.texts[i]) for i in self._scan_corpus(term)]
+            candidates = range(len(self.items))
+        else:
+            postings = []
+            for gram in {term[k:k + 3] for k in range(len(term) - 2)}:
+                docs = self.postings.get(gram)
+                if not docs:
+                    return []
+                postings.append(docs)
+            postings.sort(key=len)
+            candidates = sorted(postings[0].intersection(*postings[1:]))
+        
+        texts = self.texts
+        items = self.items
+        return [(items[i], texts[i]) for i in candidates if any(term in text for text in texts[i])]
+    
+    def search_many(self, terms: Set[str]) -> Dict[str, List[Tuple[Any, Tuple[str, ...]]]]:
+        """
+        Find the documents containing each of several terms.
+        
+        With pyahocorasick installed all terms are matched in a single pass
+        over the corpus; otherwise each term is searched separately.
+        
+        Args:
+            terms: Lowercased search terms
+            
+        Returns:
+            Dictionary mapping each term to its (object, lowercased fields) pairs
+        """
+        scanned = [term for term in terms if term and "\0" not in term]
+        if not AHOCORASICK_AVAILABLE or len(scanned) < 2:
+            return {term: self.search(term) for term in terms}
+        
+        automaton = ahocorasick.Automaton()
+        for term in scanned:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        
+        # Matches arrive by end position, so each term's rows are in index order
+        offsets = self.offsets
+        rows = {term: [] for term in scanned}
+        for end, term in automaton.iter(self.corpus):
+            row = bisect.bisect_right(offsets, end - len(term) + 1) - 1
+            term_rows = rows[term]
+            if not term_rows or term_rows[-1] != row:
+                term_rows.append(row)
+        
+        results = {term: self.search(term) for term in terms if term not in rows}
+        for term, term_rows in rows.items():
+            results[term] = [(self.items[i], self.texts[i]) for i in term_rows]
+        
+        return results
+    
+    def _scan_corpus(self, term: str) -> List[int]:
+        """
+        Find the documents containing a term by scanning the corpus.
+        
+        Args:
+            term: Lowercased search term without NUL characters
+            
+        Returns:
+            Row numbers of the matching documents, in index order
+        """
+        corpus = self.corpus
+        offsets = self.offsets
+        rows = []
+        
+        position = corpus.find(term)
+        while position != -1:
+            row = bisect.bisect_right(offsets, position) - 1
+            rows.append(row)
+            
+            # Continue from the start of the next document
+            if row + 1 >= len(offsets):
+                break
+            position = corpus.find(term, offsets[row + 1])
+        
+        return rows
+
+
+def _partial_paths(adjacency, start: str, stop: str, depth: int) -> Dict[str, List[List[str]]]:
+    """
+    Grow all simple paths of up to depth edges from a start node.
+    
+    Args:
+        adjacency: Successor (or predecessor) adjacency of the graph
+        start: Node the paths start from
+        stop: Node the paths may end at but not pass through
+        depth: Maximum number of edges
+        
+    Returns:
+        Dictionary mapping end node to the paths ending there
+    """
+    paths = {start: [[start]]}
+    frontier = [[start]]
+    
+    for _ in range(depth):
+        next_frontier = []
+        for path in frontier:
+            last = path[-1]
+            if last == stop:
+                continue
+            
+            for neighbor in adjacency[last]:
+                if neighbor in path:
+                    continue
+                new_path = path + [neighbor]
+                next_frontier.append(new_path)
+                paths.setdefault(neighbor, []).append(new_path)
+        frontier = next_frontier
+    
+    return paths
+
+
+def _bidir_simple_paths(graph: nx.DiGraph, source: str, target: str, cutoff: int) -> List[List[str]]:
+    """
+    Find all simple paths from source to target with at most cutoff edges.
+    
+    Partial paths of up to ceil(cutoff / 2) edges are grown forward from the
+    source and of up to floor(cutoff / 2) edges backward from the target, then
+    joined where they meet. A path is only joined at its middle node, so each
+    path is produced exactly once.
+    
+    Args:
+        graph: Directed graph to search
+        source: Source node ID
+        target: Target node ID
+        cutoff: Maximum path length in edges
+        
+    Returns:
+        List of paths, each a list of node IDs
+    """
+    if source == target or cutoff < 1:
+        return []
+    
+    forward = _partial_paths(graph.succ, source, target, (cutoff + 1) // 2)
+    backward = _partial_paths(graph.pred, target, source, cutoff // 2)
+    
+    paths = []
+    for node, heads in forward.items():
+        tails = backward.get(node)
+        if not tails:
+            continue
+        
+        for head in heads:
+            for tail in tails:
+                # Join only at the middle node of the combined path
+                if len(head) - len(tail) not in (0, 1):
+                    continue
+                
+                # Both halves share only the meeting node
+                if not set(head).isdisjoint(tail[:-1]):
+                    continue
+                
+                paths.append(head + tail[-2::-1])
+    
+    return paths
+
+
 class GraphBuilder:
     """
     Builds and analyzes the financial risk knowledge graph.
@@ -24,20 +340,77 @@ class GraphBuilder:
             data_store: Data storage interface
         """
         self.data_store = data_store
-        self.graph = nx.MultiDiGraph()  # Main graph
+        self.graph = nx.DiGraph()  # Main graph
         self.entity_graph = nx.DiGraph()  # Entity layer
         self.event_graph = nx.DiGraph()  # Event layer
         self.risk_graph = nx.DiGraph()  # Risk layer
         
-    def build_complete_graph(self) -> None:
+        # Node lookups cached when the combined graph is built
+        self._node_layer = {}
+        self._node_attrs = {}
+        
+        # Column tables of node attributes, by layer
+        self._node_tables = {}
+        
+        # Signature of the data the current graph was built from
+        self._last_build_sig = None
+        
+        # Search indexes by data store collection, with the revision they were built at
+        self._search_indexes = {}
+        
+        # Bumped whenever the graph changes, to key the path cache
+        self._graph_version = 0
+        self._find_paths_cached = functools.lru_cache(maxsize=1024)(self._find_paths_impl)
+        
+        # Analysis results keyed by (build signature, measure or method)
+        self._centrality_cache = {}
+        self._community_cache = {}
+        
+    def _data_signature(self) -> Tuple:
+        """
+        Compute a cheap signature of the underlying data.
+        
+        Returns:
+            Tuple of data file modification times and collection sizes
+        """
+        mtimes = []
+        for path in (self.data_store.entity_file, self.data_store.event_file, self.data_store.risk_file):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        
+        return (
+            *mtimes,
+            len(self.data_store.entities),
+            len(self.data_store.relationships),
+            len(self.data_store.events),
+            len(self.data_store.risks)
+        )
+    
+    def build_complete_graph(self, force: bool = False) -> None:
         """
         Build the complete three-layer knowledge graph.
+        
+        Args:
+            force: Rebuild even if the data is unchanged since the last build
         """
+        sig = self._data_signature()
+        if not force and sig == self._last_build_sig:
+            logger.info("Data unchanged since last build, reusing knowledge graph")
+            return
+        
         # Clear existing graphs
         self.graph.clear()
         self.entity_graph.clear()
         self.event_graph.clear()
         self.risk_graph.clear()
+        self._node_layer = {}
+        self._node_attrs = {}
+        self._node_tables = {}
+        self._centrality_cache = {}
+        self._community_cache = {}
+        self._graph_version += 1
         
         # Load all data
         entities = self.data_store.get_all_entities()
@@ -47,23 +420,88 @@ class GraphBuilder:
         
         # Build entity layer
         self._build_entity_layer(entities, relationships)
-        logger.info(f"Built entity layer with {len(entities)} entities and {len(relationships)} relationships")
+        logger.info("Built entity layer with %s entities and %s relationships", len(entities), len(relationships))
         
         # Build event layer and connections to entity layer
         self._build_event_layer(events, entities)
-        logger.info(f"Built event layer with {len(events)} events")
+        logger.info("Built event layer with %s events", len(events))
         
         # Build risk layer and connections to event and entity layers
         self._build_risk_layer(risks, events, entities)
-        logger.info(f"Built risk layer with {len(risks)} risks")
+        logger.info("Built risk layer with %s risks", len(risks))
         
         # Build the combined graph
         self._build_combined_graph()
-        logger.info(f"Built combined knowledge graph with {len(self.graph.nodes)} nodes and {len(self.graph.edges)} edges")
+        logger.info("Built combined knowledge graph with %s nodes and %s edges", len(self.graph.nodes), len(self.graph.edges))
+        
+        self._last_build_sig = sig
         
         # Save the graph structure to file
         self._save_graph_to_file()
     
+    def add_events(self, events: List) -> None:
+        """
+        Add new events to the existing knowledge graph without a full rebuild.
+        
+        Events already in the graph are skipped, and links from existing data
+        to the new events are not added; use build_complete_graph to pick
+        up such changes. The graph file is not rewritten.
+        
+        Args:
+            events: List of event objects
+        """
+        if not self.graph.nodes:
+            self.build_complete_graph()
+            return
+        
+        new_events = [event for event in events if not self.event_graph.has_node(event.id)]
+        if not new_events:
+            return
+        
+        self._add_event_nodes(new_events)
+        self._add_event_edges(new_events)
+        self._add_combined_delta(self.event_graph, [event.id for event in new_events], "event", _EVENT_EDGE_LAYERS)
+        logger.info("Added %s events to the knowledge graph", len(new_events))
+    
+    def add_risks(self, risks: List) -> None:
+        """
+        Add new risks to the existing knowledge graph without a full rebuild.
+        
+        Risks already in the graph are skipped, and links from existing data
+        to the new risks are not added; use build_complete_graph to pick
+        up such changes. The graph file is not rewritten.
+        
+        Args:
+            risks: List of risk objects
+        """
+        if not self.graph.nodes:
+            self.build_complete_graph()
+            return
+        
+        new_risks = [risk for risk in risks if not self.risk_graph.has_node(risk.id)]
+        if not new_risks:
+            return
+        
+        self._add_risk_nodes(new_risks)
+        self._add_risk_edges(new_risks)
+        self._add_combined_delta(self.risk_graph, [risk.id for risk in new_risks], "risk", _RISK_EDGE_LAYERS)
+        logger.info("Added %s risks to the knowledge graph", len(new_risks))
+    
+    def _extend_node_table(self, layer: str, ids: List[str], columns: Dict[str, List[Any]]) -> None:
+        """
+        Create or extend the column table of a layer.
+        
+        Args:
+            layer: Layer name
+            ids: Node IDs, one per row
+            columns: Attribute columns, each aligned with ids
+        """
+        table = self._node_tables.get(layer)
+        if table is None:
+            self._node_tables[layer] = _NodeTable(ids, columns)
+        else:
+            table.extend(ids, columns)
+    
     def _build_entity_layer(self, entities: List, relationships: List) -> None:
         """
         Build the entity layer of the knowledge graph.
@@ -72,33 +510,47 @@ class GraphBuilder:
             entities: List of entity objects
             relationships: List of relationship objects
         """
-        # Add all entities as nodes
-        for entity in entities:
-            self.entity_graph.add_node(
-                entity.id,
-                type="entity",
-                name=entity.name,
-                entity_type=entity.type,
-                subtype=entity.subtype,
-                attributes=entity.attributes,
-                mention_count=len(entity.mentions)
-            )
+        # Read each attribute once into columns shared by the table and the nodes
+        ids = [entity.id for entity in entities]
+        names = [entity.name for entity in entities]
+        entity_types = [entity.type for entity in entities]
+        subtypes = [entity.subtype for entity in entities]
+        mention_counts = [len(entity.mentions) for entity in entities]
         
-        # Add relationships as edges
-        for rel in relationships:
-            # Skip if source or target doesn't exist
-            if not self.entity_graph.has_node(rel.source_id) or not self.entity_graph.has_node(rel.target_id):
-                continue
-                
-            self.entity_graph.add_edge(
-                rel.source_id,
-                rel.target_id,
-                id=rel.id,
-                type=rel.type,
-                weight=rel.confidence,
-                attributes=rel.attributes,
-                mention_count=len(rel.mentions)
-            )
+        # Keep a column table of the attributes used by the analysis views
+        self._node_tables["entity"] = _NodeTable(ids, {
+            "name": names,
+            "entity_type": entity_types,
+            "subtype": subtypes,
+            "mention_count": mention_counts
+        })
+        
+        # Add all entities as nodes in one batch
+        self.entity_graph.add_nodes_from(
+            (node_id, {
+                "type": "entity",
+                "name": name,
+                "entity_type": entity_type,
+                "subtype": subtype,
+                "attributes": entity.attributes,
+                "mention_count": mention_count
+            })
+            for node_id, name, entity_type, subtype, mention_count, entity
+            in zip(ids, names, entity_types, subtypes, mention_counts, entities)
+        )
+        
+        # Add relationships as edges, skipping those with a missing source or target
+        self.entity_graph.add_edges_from(
+            (rel.source_id, rel.target_id, {
+                "id": rel.id,
+                "type": rel.type,
+                "weight": rel.confidence,
+                "attributes": rel.attributes,
+                "mention_count": len(rel.mentions)
+            })
+            for rel in relationships
+            if self.entity_graph.has_node(rel.source_id) and self.entity_graph.has_node(rel.target_id)
+        )
     
     def _build_event_layer(self, events: List, entities: List) -> None:
         """
@@ -108,18 +560,51 @@ class GraphBuilder:
             events: List of event objects
             entities: List of entity objects
         """
-        # Add all events as nodes
+        self._add_event_nodes(events)
+        self._add_event_edges(events)
+    
+    def _add_event_nodes(self, events: List) -> None:
+        """
+        Add events and their edges to entities to the event layer.
+        
+        Args:
+            events: List of event objects
+        """
+        # Read each attribute once into columns shared by the table and the nodes
+        ids = [event.id for event in events]
+        titles = [event.title for event in events]
+        descriptions = [event.description for event in events]
+        event_types = [event.event_type for event in events]
+        event_dates = [event.event_date.isoformat() for event in events]
+        entity_counts = [len(event.entities) for event in events]
+        
+        # Keep a column table of the attributes used by the analysis views
+        self._extend_node_table("event", ids, {
+            "title": titles,
+            "description": descriptions,
+            "event_type": event_types,
+            "event_date": event_dates,
+            "entity_count": entity_counts
+        })
+        
+        # Collect event nodes and their edges to entities, then add them in batches
+        node_list = [
+            (node_id, {
+                "type": "event",
+                "title": title,
+                "description": description,
+                "event_type": event_type,
+                "event_date": event_date,
+                "attributes": event.attributes,
+                "entity_count": entity_count
+            })
+            for node_id, title, description, event_type, event_date, entity_count, event
+            in zip(ids, titles, descriptions, event_types, event_dates, entity_counts, events)
+        ]
+        edge_list = []
+        
         for event in events:
-            self.event_graph.add_node(
-                event.id,
-                type="event",
-                title=event.title,
-                description=event.description,
-                event_type=event.event_type,
-                event_date=event.event_date.isoformat(),
-                attributes=event.attributes,
-                entity_count=len(event.entities)
-            )
+            entity_roles = event.attributes.get("entity_roles") or {}
             
             # Add edges to entities
             for entity_id in event.entities:
@@ -128,20 +613,26 @@ class GraphBuilder:
                     continue
                     
                 # Get entity role from event attributes if available
-                role = "participant"
-                if "entity_roles" in event.attributes and entity_id in event.attributes["entity_roles"]:
-                    role = event.attributes["entity_roles"][entity_id]
+                role = entity_roles.get(entity_id, "participant")
                 
-                # Add edge from event to entity
-                self.event_graph.add_edge(
-                    event.id,
-                    entity_id,
-                    type="involves",
-                    role=role,
-                    layer_edge="event_to_entity"
-                )
-        
-        # Add event evolution relationships
+                # Edge from event to entity
+                edge_list.append((event.id, entity_id, {
+                    "type": "involves",
+                    "role": role,
+                    "layer_edge": "event_to_entity"
+                }))
+        
+        self.event_graph.add_nodes_from(node_list)
+        self.event_graph.add_edges_from(edge_list)
+    
+    def _add_event_edges(self, events: List) -> None:
+        """
+        Add evolution edges from predecessor events to the event layer.
+        
+        Args:
+            events: List of event objects already in the event layer
+        """
+        edge_list = []
         for event in events:
             # Check for predecessor events
             if "predecessors" in event.attributes:
@@ -154,14 +645,14 @@ class GraphBuilder:
                     if not self.event_graph.has_node(pred_id):
                         continue
                         
-                    # Add edge from predecessor to this event
-                    self.event_graph.add_edge(
-                        pred_id,
-                        event.id,
-                        type=rel_type,
-                        weight=similarity,
-                        layer_edge="event_to_event"
-                    )
+                    # Edge from predecessor to this event
+                    edge_list.append((pred_id, event.id, {
+                        "type": rel_type,
+                        "weight": similarity,
+                        "layer_edge": "event_to_event"
+                    }))
+        
+        self.event_graph.add_edges_from(edge_list)
     
     def _build_risk_layer(self, risks: List, events: List, entities: List) -> None:
         """
@@ -172,19 +663,55 @@ class GraphBuilder:
             events: List of event objects
             entities: List of entity objects
         """
-        # Add all risks as nodes
+        self._add_risk_nodes(risks)
+        self._add_risk_edges(risks)
+    
+    def _add_risk_nodes(self, risks: List) -> None:
+        """
+        Add risks and their edges to entities and events to the risk layer.
+        
+        Args:
+            risks: List of risk objects
+        """
+        # Read each attribute once into columns shared by the table and the nodes
+        ids = [risk.id for risk in risks]
+        titles = [risk.title for risk in risks]
+        descriptions = [risk.description for risk in risks]
+        risk_types = [risk.risk_type for risk in risks]
+        severities = [risk.severity for risk in risks]
+        likelihoods = [risk.likelihood for risk in risks]
+        impact_areas = [risk.impact_areas for risk in risks]
+        
+        # Keep a column table of the attributes used by the analysis views
+        self._extend_node_table("risk", ids, {
+            "title": titles,
+            "description": descriptions,
+            "risk_type": risk_types,
+            "severity": severities,
+            "likelihood": likelihoods,
+            "impact_areas": impact_areas
+        })
+        
+        # Collect risk nodes and their edges to entities and events, then add them in batches
+        node_list = [
+            (node_id, {
+                "type": "risk",
+                "title": title,
+                "description": description,
+                "risk_type": risk_type,
+                "severity": severity,
+                "likelihood": likelihood,
+                "attributes": risk.attributes,
+                "impact_areas": areas
+            })
+            for node_id, title, description, risk_type, severity, likelihood, areas, risk
+            in zip(ids, titles, descriptions, risk_types, severities, likelihoods, impact_areas, risks)
+        ]
+        edge_list = []
+        
         for risk in risks:
-            self.risk_graph.add_node(
-                risk.id,
-                type="risk",
-                title=risk.title,
-                description=risk.description,
-                risk_type=risk.risk_type,
-                severity=risk.severity,
-                likelihood=risk.likelihood,
-                attributes=risk.attributes,
-                impact_areas=risk.impact_areas
-            )
+            entity_impacts = risk.attributes.get("entity_impacts") or {}
+            event_correlations = risk.attributes.get("event_correlations") or {}
             
             # Add edges to affected entities
             for entity_id in risk.entities:
@@ -193,18 +720,14 @@ class GraphBuilder:
                     continue
                     
                 # Get impact level from risk attributes if available
-                impact = 1.0
-                if "entity_impacts" in risk.attributes and entity_id in risk.attributes["entity_impacts"]:
-                    impact = risk.attributes["entity_impacts"][entity_id]
+                impact = entity_impacts.get(entity_id, 1.0)
                 
-                # Add edge from risk to entity
-                self.risk_graph.add_edge(
-                    risk.id,
-                    entity_id,
-                    type="affects",
-                    impact=impact,
-                    layer_edge="risk_to_entity"
-                )
+                # Edge from risk to entity
+                edge_list.append((risk.id, entity_id, {
+                    "type": "affects",
+                    "impact": impact,
+                    "layer_edge": "risk_to_entity"
+                }))
             
             # Add edges to triggering events
             for event_id in risk.events:
@@ -213,46 +736,53 @@ class GraphBuilder:
                     continue
                     
                 # Get correlation from risk attributes if available
-                correlation = 1.0
-                if "event_correlations" in risk.attributes and event_id in risk.attributes["event_correlations"]:
-                    correlation = risk.attributes["event_correlations"][event_id]
+                correlation = event_correlations.get(event_id, 1.0)
                 
-                # Add edge from event to risk
-                self.risk_graph.add_edge(
-                    event_id,
-                    risk.id,
-                    type="triggers",
-                    correlation=correlation,
-                    layer_edge="event_to_risk"
-                )
-        
-        # Add risk relationship edges
+                # Edge from event to risk
+                edge_list.append((event_id, risk.id, {
+                    "type": "triggers",
+                    "correlation": correlation,
+                    "layer_edge": "event_to_risk"
+                }))
+        
+        self.risk_graph.add_nodes_from(node_list)
+        self.risk_graph.add_edges_from(edge_list)
+    
+    def _add_risk_edges(self, risks: List) -> None:
+        """
+        Add relationship edges between risks to the risk layer.
+        
+        Args:
+            risks: List of risk objects already in the risk layer
+        """
+        edge_list = []
         for risk in risks:
+            risk_relationships = risk.attributes.get("risk_relationships") or {}
+            risk_correlations = risk.attributes.get("risk_correlations") or {}
+            risk_transmissions = risk.attributes.get("risk_transmissions") or {}
+            
             for related_id in risk.related_risks:
                 # Skip if related risk doesn't exist
                 if not self.risk_graph.has_node(related_id):
                     continue
                     
                 # Get relationship type from risk attributes if available
-                rel_type = "related_to"
-                if "risk_relationships" in risk.attributes and related_id in risk.attributes["risk_relationships"]:
-                    rel_type = risk.attributes["risk_relationships"][related_id]
+                rel_type = risk_relationships.get(related_id, "related_to")
                 
                 # Get relationship strength/weight if available
-                weight = 0.5
-                if "risk_correlations" in risk.attributes and related_id in risk.attributes["risk_correlations"]:
-                    weight = risk.attributes["risk_correlations"][related_id]
-                elif "risk_transmissions" in risk.attributes and related_id in risk.attributes["risk_transmissions"]:
-                    weight = risk.attributes["risk_transmissions"][related_id]
+                if related_id in risk_correlations:
+                    weight = risk_correlations[related_id]
+                else:
+                    weight = risk_transmissions.get(related_id, 0.5)
                 
-                # Add edge between risks
-                self.risk_graph.add_edge(
-                    risk.id,
-                    related_id,
-                    type=rel_type,
-                    weight=weight,
-                    layer_edge="risk_to_risk"
-                )
+                # Edge between risks
+                edge_list.append((risk.id, related_id, {
+                    "type": rel_type,
+                    "weight": weight,
+                    "layer_edge": "risk_to_risk"
+                }))
+        
+        self.risk_graph.add_edges_from(edge_list)
     
     def _build_combined_graph(self) -> None:
         """
@@ -265,7 +795,7 @@ class GraphBuilder:
             self.graph.add_node(node, layer="entity", **attrs)
         
         for u, v, attrs in self.entity_graph.edges(data=True):
-            self.graph.add_edge(u, v, layer="entity", **attrs)
+            self._add_combined_edge(u, v, "entity", attrs)
         
         # Add event layer
         for node, attrs in self.event_graph.nodes(data=True):
@@ -273,10 +803,9 @@ class GraphBuilder:
                 self.graph.add_node(node, layer="event", **attrs)
         
         for u, v, attrs in self.event_graph.edges(data=True):
-            if attrs.get("layer_edge") == "event_to_event":
-                self.graph.add_edge(u, v, layer="event", **attrs)
-            elif attrs.get("layer_edge") == "event_to_entity":
-                self.graph.add_edge(u, v, layer="event_to_entity", **attrs)
+            layer = _EVENT_EDGE_LAYERS.get(attrs.get("layer_edge"))
+            if layer is not None:
+                self._add_combined_edge(u, v, layer, attrs)
         
         # Add risk layer
         for node, attrs in self.risk_graph.nodes(data=True):
@@ -284,12 +813,69 @@ class GraphBuilder:
                 self.graph.add_node(node, layer="risk", **attrs)
         
         for u, v, attrs in self.risk_graph.edges(data=True):
-            if attrs.get("layer_edge") == "risk_to_risk":
-                self.graph.add_edge(u, v, layer="risk", **attrs)
-            elif attrs.get("layer_edge") == "risk_to_entity":
-                self.graph.add_edge(u, v, layer="risk_to_entity", **attrs)
-            elif attrs.get("layer_edge") == "event_to_risk":
-                self.graph.add_edge(u, v, layer="event_to_risk", **attrs)
+            layer = _RISK_EDGE_LAYERS.get(attrs.get("layer_edge"))
+            if layer is not None:
+                self._add_combined_edge(u, v, layer, attrs)
+        
+        # Cache node layers and attributes for the analysis methods
+        self._node_attrs = dict(self.graph.nodes(data=True))
+        self._node_layer = {n: a.get("layer", "unknown") for n, a in self._node_attrs.items()}
+    
+    def _add_combined_edge(self, u: str, v: str, layer: str, attrs: Dict[str, Any]) -> None:
+        """
+        Add an edge to the combined graph.
+        
+        The combined graph keeps one edge per node pair. If a pair is already
+        connected, the extra layer is recorded in the "layers" attribute of
+        the existing edge.
+        
+        Args:
+            u: Source node ID
+            v: Target node ID
+            layer: Layer name for the edge
+            attrs: Edge attributes from the layer graph
+        """
+        if self.graph.has_edge(u, v):
+            self.graph[u][v].setdefault("layers", []).append(layer)
+        else:
+            self.graph.add_edge(u, v, layer=layer, **attrs)
+    
+    def _add_combined_delta(self, layer_graph: nx.DiGraph, node_ids: List[str], node_layer: str,
+                            edge_layers: Dict[str, str]) -> None:
+        """
+        Merge new layer nodes and their edges into the combined graph.
+        
+        Args:
+            layer_graph: Layer graph the nodes were added to
+            node_ids: IDs of the new nodes
+            node_layer: Layer name for the new nodes
+            edge_layers: Combined graph layer of each layer edge kind
+        """
+        for node in node_ids:
+            if not self.graph.has_node(node):
+                self.graph.add_node(node, layer=node_layer, **layer_graph.nodes[node])
+            
+            # Refresh the cached lookups for the node
+            attrs = self.graph.nodes[node]
+            self._node_attrs[node] = attrs
+            self._node_layer[node] = attrs.get("layer", "unknown")
+        
+        # Edges between two new nodes show up both as out- and in-edges
+        seen = set()
+        for edges in (layer_graph.out_edges(node_ids, data=True), layer_graph.in_edges(node_ids, data=True)):
+            for u, v, attrs in edges:
+                if (u, v) in seen:
+                    continue
+                seen.add((u, v))
+                
+                layer = edge_layers.get(attrs.get("layer_edge"))
+                if layer is not None:
+                    self._add_combined_edge(u, v, layer, attrs)
+        
+        # Analysis results no longer match the graph
+        self._centrality_cache = {}
+        self._community_cache = {}
+        self._graph_version += 1
     
     def _save_graph_to_file(self) -> None:
         """
@@ -320,11 +906,10 @@ class GraphBuilder:
                 graph_data["nodes"].append(node_data)
             
             # Add edges
-            for u, v, key, attrs in self.graph.edges(data=True, keys=True):
+            for u, v, attrs in self.graph.edges(data=True):
                 edge_data = {
                     "source": u,
                     "target": v,
-                    "key": str(key),
                     **attrs
                 }
                 
@@ -340,10 +925,99 @@ class GraphBuilder:
             with open(self.data_store.graph_file, 'w') as f:
                 json.dump(graph_data, f, indent=2)
                 
-            logger.info(f"Saved knowledge graph to {self.data_store.graph_file}")
+            logger.info("Saved knowledge graph to %s", self.data_store.graph_file)
         
         except Exception as e:
-            logger.error(f"Error saving graph to file: {e}")
+            logger.error("Error saving graph to file: %s", e)
+    
+    def _layer_nodes(self, layer: str) -> Set[str]:
+        """
+        Get the IDs of the nodes that belong to a layer.
+        
+        Each layer graph also holds the endpoints of its cross-layer edges
+        (event-to-entity, risk-to-entity, event-to-risk), so lower layers are
+        subtracted to match the layer assignment of the combined graph.
+        
+        Args:
+            layer: Graph layer ("entity", "event", or "risk")
+            
+        Returns:
+            Set of node IDs in the layer
+        """
+        if layer == "entity":
+            return set(self.entity_graph)
+        if layer == "event":
+            return set(self.event_graph).difference(self.entity_graph)
+        if layer == "risk":
+            return set(self.risk_graph).difference(self.event_graph, self.entity_graph)
+        return set()
+    
+    def _vis_node_records(self, layer: str, node_ids: Set[str]) -> List[Dict[str, Any]]:
+        """
+        Build visualization node records for one layer from its column table.
+        
+        Args:
+            layer: Graph layer ("entity", "event", or "risk")
+            node_ids: IDs of the layer's nodes to include
+            
+        Returns:
+            List of node dictionaries for visualization
+        """
+        table = self._node_tables.get(layer)
+        if table is None:
+            return []
+        
+        ids = table.ids
+        columns = table.columns
+        rows = table.rows(node_ids)
+        
+        if layer == "entity":
+            names = columns["name"]
+            types = columns["entity_type"]
+            subtypes = columns["subtype"]
+            mentions = columns["mention_count"]
+            return [{
+                "id": ids[i],
+                "layer": "entity",
+                "label": names[i],
+                "title": f"{names[i]}: {types[i]}",
+                "type": types[i],
+                "subtype": subtypes[i],
+                "mentions": mentions[i]
+            } for i in rows]
+        
+        if layer == "event":
+            titles = columns["title"]
+            descriptions = columns["description"]
+            types = columns["event_type"]
+            dates = columns["event_date"]
+            entity_counts = columns["entity_count"]
+            return [{
+                "id": ids[i],
+                "layer": "event",
+                "label": titles[i],
+                "title": descriptions[i],
+                "type": types[i],
+                "date": dates[i],
+                "entities": entity_counts[i]
+            } for i in rows]
+        
+        titles = columns["title"]
+        descriptions = columns["description"]
+        types = columns["risk_type"]
+        severities = columns["severity"]
+        likelihoods = columns["likelihood"]
+        impact_areas = columns["impact_areas"]
+        return [{
+            "id": ids[i],
+            "layer": "risk",
+            "label": titles[i],
+            "title": descriptions[i],
+            "type": types[i],
+            "severity": severities[i],
+            "likelihood": likelihoods[i],
+            "impact_areas": impact_areas[i]
+        } for i in rows]
     
     def get_visualization_data(self, layer: str = "all") -> Dict[str, Any]:
         """
@@ -373,7 +1047,7 @@ class GraphBuilder:
                     # Try to build the graph
                     self.build_complete_graph()
                 except Exception as build_error:
-                    logger.warning(f"Could not build graph: {build_error}")
+                    logger.warning("Could not build graph: %s", build_error)
                     # If that fails, try to read from the file directly
                     try:
                         with open(self.data_store.db_config["graph_file"], 'r') as f:
@@ -381,7 +1055,7 @@ class GraphBuilder:
                             # Return the file contents directly
                             return graph_data
                     except Exception as read_error:
-                        logger.warning(f"Could not read graph file: {read_error}")
+                        logger.warning("Could not read graph file: %s", read_error)
                         # Return empty visualization data with error flag
                         return {
                             "nodes": [],
@@ -395,23 +1069,19 @@ class GraphBuilder:
                         }
             
             # If we have nodes in the graph, proceed with visualization
-            # Filter nodes by layer
+            # Filter nodes by layer using the layer graphs directly
             nodes_to_include = set()
+            layer_node_sets = {}
+            requested_layers = ["entity", "event", "risk"] if layer == "all" else [layer]
             
-            if layer == "all" or layer == "entity":
-                entity_nodes = [n for n, a in self.graph.nodes(data=True) if a.get("layer") == "entity"]
-                nodes_to_include.update(entity_nodes)
-                vis_data["layers"]["entity"]["count"] = len(entity_nodes)
-            
-            if layer == "all" or layer == "event":
-                event_nodes = [n for n, a in self.graph.nodes(data=True) if a.get("layer") == "event"]
-                nodes_to_include.update(event_nodes)
-                vis_data["layers"]["event"]["count"] = len(event_nodes)
-            
-            if layer == "all" or layer == "risk":
-                risk_nodes = [n for n, a in self.graph.nodes(data=True) if a.get("layer") == "risk"]
-                nodes_to_include.update(risk_nodes)
-                vis_data["layers"]["risk"]["count"] = len(risk_nodes)
+            for layer_name in requested_layers:
+                if layer_name not in vis_data["layers"]:
+                    continue
+                
+                layer_nodes = self._layer_nodes(layer_name)
+                layer_node_sets[layer_name] = layer_nodes
+                nodes_to_include.update(layer_nodes)
+                vis_data["layers"][layer_name]["count"] = len(layer_nodes)
             
             # If we have no nodes to include after filtering, return empty data with message
             if not nodes_to_include:
@@ -426,50 +1096,12 @@ class GraphBuilder:
                     "error": f"No {layer} data available. Process data to build the graph."
                 }
             
-            # Add nodes
-            for node in nodes_to_include:
-                attrs = self.graph.nodes[node]
-                node_layer = attrs.get("layer", "unknown")
-                
-                # Base node data
-                node_data = {
-                    "id": node,
-                    "layer": node_layer
-                }
-                
-                # Layer-specific data
-                if node_layer == "entity":
-                    node_data.update({
-                        "label": attrs.get("name", "Unknown Entity"),
-                        "title": f"{attrs.get('name', 'Unknown')}: {attrs.get('entity_type', '')}",
-                        "type": attrs.get("entity_type", ""),
-                        "subtype": attrs.get("subtype", ""),
-                        "mentions": attrs.get("mention_count", 0)
-                    })
-                
-                elif node_layer == "event":
-                    node_data.update({
-                        "label": attrs.get("title", "Unknown Event"),
-                        "title": attrs.get("description", ""),
-                        "type": attrs.get("event_type", ""),
-                        "date": attrs.get("event_date", ""),
-                        "entities": attrs.get("entity_count", 0)
-                    })
-                
-                elif node_layer == "risk":
-                    node_data.update({
-                        "label": attrs.get("title", "Unknown Risk"),
-                        "title": attrs.get("description", ""),
-                        "type": attrs.get("risk_type", ""),
-                        "severity": attrs.get("severity", 1),
-                        "likelihood": attrs.get("likelihood", 0.0),
-                        "impact_areas": attrs.get("impact_areas", [])
-                    })
-                
-                vis_data["nodes"].append(node_data)
+            # Add nodes, projected from the layer column tables
+            for layer_name, layer_nodes in layer_node_sets.items():
+                vis_data["nodes"].extend(self._vis_node_records(layer_name, layer_nodes))
             
             # Add edges between included nodes
-            for u, v, key, attrs in self.graph.edges(data=True, keys=True):
+            for u, v, attrs in self.graph.edges(data=True):
                 # Skip if either node not in our included set
                 if u not in nodes_to_include or v not in nodes_to_include:
                     continue
@@ -488,7 +1120,7 @@ class GraphBuilder:
                     weight = attrs["correlation"]
                 
                 edge_data = {
-                    "id": f"{u}-{v}-{key}",
+                    "id": f"{u}-{v}",
                     "source": u,
                     "target": v,
                     "label": attrs.get("type", "connected_to"),
@@ -500,7 +1132,7 @@ class GraphBuilder:
                 vis_data["edges"].append(edge_data)
         
         except Exception as e:
-            logger.error(f"Error generating visualization data: {e}")
+            logger.error("Error generating visualization data: %s", e)
             import traceback
             traceback.print_exc()
             return {
@@ -537,6 +1169,11 @@ class GraphBuilder:
             if not self.graph.nodes:
                 self.build_complete_graph()
             
+            # Reuse results computed on the same graph
+            cache_key = (self._last_build_sig, measure)
+            if cache_key in self._centrality_cache:
+                return self._centrality_cache[cache_key]
+            
             # Create a simplified undirected graph for centrality calculations
             simple_graph = nx.Graph()
             
@@ -550,24 +1187,26 @@ class GraphBuilder:
                     simple_graph.add_edge(u, v, weight=attrs.get("weight", 0.5))
             
             # Calculate centrality based on selected measure
-            if measure == "degree":
+            if measure in ("degree", "closeness") and graph_kernels.NUMBA_AVAILABLE:
+                centrality = self._kernel_centrality(simple_graph, measure)
+            elif measure == "degree":
                 centrality = nx.degree_centrality(simple_graph)
             elif measure == "betweenness":
                 centrality = nx.betweenness_centrality(simple_graph, weight="weight")
             elif measure == "closeness":
                 centrality = nx.closeness_centrality(simple_graph, distance="weight")
             elif measure == "eigenvector":
-                centrality = nx.eigenvector_centrality_numpy(simple_graph, weight="weight")
+                centrality = self._eigenvector_centrality(simple_graph)
             else:
                 centrality = nx.degree_centrality(simple_graph)
             
             # Group results by layer
             for node, cent_value in centrality.items():
-                if node not in self.graph.nodes:
+                layer = self._node_layer.get(node)
+                if layer is None:
                     continue
                     
-                attrs = self.graph.nodes[node]
-                layer = attrs.get("layer", "unknown")
+                attrs = self._node_attrs[node]
                 
                 if layer not in results:
                     continue
@@ -599,18 +1238,99 @@ class GraphBuilder:
             # Sort results by centrality
             for layer in results:
                 results[layer] = sorted(results[layer], key=lambda x: x["centrality"], reverse=True)
+            
+            self._centrality_cache[cache_key] = results
         
         except Exception as e:
-            logger.error(f"Error calculating {measure} centrality: {e}")
+            logger.error("Error calculating %s centrality: %s", measure, e)
         
         return results
     
-    def detect_communities(self, method: str = "louvain") -> Dict[str, List[Dict[str, Any]]]:
+    def _to_csr(self, simple_graph: nx.Graph, reorder: bool = True) -> Tuple[Any, List[str]]:
+        """
+        Convert a simplified undirected graph into a CSR adjacency matrix.
+        
+        Nodes arrive in layer insertion order, which scatters neighbours across
+        the matrix. With reorder enabled the rows and columns are permuted with
+        Reverse Cuthill-McKee to reduce bandwidth, so traversals touch nearby
+        memory. The returned node list always maps row index to node ID.
+        
+        Args:
+            simple_graph: Undirected graph with "weight" edge attributes
+            reorder: Whether to apply Reverse Cuthill-McKee reordering
+            
+        Returns:
+            Tuple of (CSR matrix, node list mapping row index to node ID)
+        """
+        node_list = list(simple_graph.nodes)
+        csr = nx.to_scipy_sparse_array(simple_graph, nodelist=node_list, weight="weight", format="csr")
+        
+        if reorder and len(node_list) > 2:
+            perm = reverse_cuthill_mckee(csr, symmetric_mode=True)
+            csr = csr[perm][:, perm].tocsr()
+            csr.sort_indices()
+            node_list = [node_list[p] for p in perm]
+        
+        return csr, node_list
+    
+    def _kernel_centrality(self, simple_graph: nx.Graph, measure: str) -> Dict[str, float]:
+        """
+        Calculate centrality with the compiled CSR kernels.
+        
+        Args:
+            simple_graph: Undirected graph with "weight" edge attributes
+            measure: Centrality measure ("degree" or "closeness")
+            
+        Returns:
+            Dictionary mapping node ID to centrality value
+        """
+        csr, node_list = self._to_csr(simple_graph)
+        indptr = csr.indptr.astype(np.int64)
+        indices = csr.indices.astype(np.int64)
+        
+        if measure == "closeness":
+            values = graph_kernels.closeness_centrality(indptr, indices, csr.data.astype(np.float64))
+        else:
+            values = graph_kernels.degree_centrality(indptr, indices)
+        
+        return {node_list[i]: float(value) for i, value in enumerate(values)}
+    
+    def _eigenvector_centrality(self, simple_graph: nx.Graph) -> Dict[str, float]:
+        """
+        Calculate eigenvector centrality with a sparse Lanczos solver.
+        
+        Matches networkx.eigenvector_centrality_numpy (unit L2 norm, positive
+        sign, and an error on disconnected graphs) without densifying the
+        adjacency matrix.
+        
+        Args:
+            simple_graph: Undirected graph with "weight" edge attributes
+            
+        Returns:
+            Dictionary mapping node ID to centrality value
+        """
+        # eigsh needs more nodes than requested eigenvectors
+        if len(simple_graph) < 3:
+            return nx.eigenvector_centrality_numpy(simple_graph, weight="weight")
+        
+        if not nx.is_connected(simple_graph):
+            raise nx.AmbiguousSolution("eigenvector centrality is ambiguous for disconnected graphs")
+        
+        csr, node_list = self._to_csr(simple_graph, reorder=False)
+        _, vectors = eigsh(csr.astype(np.float64), k=1, which="LA")
+        
+        largest = vectors[:, 0]
+        largest = largest / (np.sign(largest.sum()) * np.linalg.norm(largest))
+        
+        return dict(zip(node_list, largest.tolist()))
+    
+    def detect_communities(self, method: str = "louvain", top_k: Optional[int] = 50) -> Dict[str, List[Dict[str, Any]]]:
         """
         Detect communities in the knowledge graph.
         
         Args:
             method: Community detection method ("louvain", "label_propagation")
+            top_k: Number of largest communities to return per layer, or None for all
             
         Returns:
             Dictionary with community detection results by layer
@@ -627,125 +1347,142 @@ class GraphBuilder:
             if not self.graph.nodes:
                 self.build_complete_graph()
             
-            # Create a simplified undirected graph for community detection
-            simple_graph = nx.Graph()
-            
-            # Add nodes and edges from the main graph
-            for n, attrs in self.graph.nodes(data=True):
-                simple_graph.add_node(n, **attrs)
+            # Reuse the full ranking computed on the same graph; only the cut depends on top_k
+            cache_key = (self._last_build_sig, method)
+            ranked = self._community_cache.get(cache_key)
+            if ranked is None:
+                ranked = self._rank_communities(method)
+                self._community_cache[cache_key] = ranked
             
-            for u, v, attrs in self.graph.edges(data=True):
-                # Add edge with weight if not already present or with higher weight
-                if not simple_graph.has_edge(u, v) or simple_graph[u][v].get("weight", 0) < attrs.get("weight", 0.5):
-                    simple_graph.add_edge(u, v, weight=attrs.get("weight", 0.5))
+            # Slicing copies the cached lists; a top_k of None keeps them whole
+            for layer, communities in ranked.items():
+                results[layer] = communities[:top_k]
+        
+        except Exception as e:
+            logger.error("Error detecting communities with %s: %s", method, e)
+        
+        return results
+    
+    def _rank_communities(self, method: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Detect communities and rank them by size within each layer.
+        
+        Args:
+            method: Community detection method ("louvain", "label_propagation")
             
-            # Apply community detection based on selected method
-            if method == "louvain":
-                partition = community_louvain.best_partition(simple_graph, weight="weight")
-            elif method == "label_propagation":
-                partition = {}
-                label_partition = nx.algorithms.community.label_propagation.label_propagation_communities(simple_graph)
-                for i, community in enumerate(label_partition):
-                    for node in community:
-                        partition[node] = i
-            else:
-                # Default to Louvain
-                partition = community_louvain.best_partition(simple_graph, weight="weight")
-            
-            # Count communities
-            community_counts = {}
-            for node, community_id in partition.items():
-                if community_id not in community_counts:
-                    community_counts[community_id] = 0
-                community_counts[community_id] += 1
-            
-            # Group results by layer and community
-            community_nodes = {}
-            for node, community_id in partition.items():
-                if node not in self.graph.nodes:
-                    continue
-                    
-                attrs = self.graph.nodes[node]
-                layer = attrs.get("layer", "unknown")
-                
-                if community_id not in community_nodes:
-                    community_nodes[community_id] = {
-                        "id": community_id,
-                        "size": community_counts[community_id],
-                        "entities": [],
-                        "events": [],
-                        "risks": []
-                    }
-                
-                node_info = {"id": node}
-                
-                # Add layer-specific information
-                if layer == "entity":
-                    node_info.update({
-                        "name": attrs.get("name", "Unknown"),
-                        "type": attrs.get("entity_type", ""),
-                        "subtype": attrs.get("subtype", "")
-                    })
-                    community_nodes[community_id]["entities"].append(node_info)
-                
-                elif layer == "event":
-                    node_info.update({
-                        "title": attrs.get("title", "Unknown"),
-                        "type": attrs.get("event_type", ""),
-                        "date": attrs.get("event_date", "")
-                    })
-                    community_nodes[community_id]["events"].append(node_info)
-                
-                elif layer == "risk":
-                    node_info.update({
-                        "title": attrs.get("title", "Unknown"),
-                        "type": attrs.get("risk_type", ""),
-                        "severity": attrs.get("severity", 1)
-                    })
-                    community_nodes[community_id]["risks"].append(node_info)
-            
-            # Process communities by layer
-            entity_communities = []
-            event_communities = []
-            risk_communities = []
-            
-            for comm_id, comm_data in community_nodes.items():
-                if comm_data["entities"]:
-                    entity_communities.append({
-                        "id": comm_id,
-                        "size": len(comm_data["entities"]),
-                        "nodes": comm_data["entities"]
-                    })
-                
-                if comm_data["events"]:
-                    event_communities.append({
-                        "id": comm_id,
-                        "size": len(comm_data["events"]),
-                        "nodes": comm_data["events"]
-                    })
+        Returns:
+            Dictionary of communities by layer, largest first
+        """
+        # Create a simplified undirected graph for community detection
+        simple_graph = nx.Graph()
+        
+        # Add nodes and edges from the main graph
+        for n, attrs in self.graph.nodes(data=True):
+            simple_graph.add_node(n, **attrs)
+        
+        for u, v, attrs in self.graph.edges(data=True):
+            # Add edge with weight if not already present or with higher weight
+            if not simple_graph.has_edge(u, v) or simple_graph[u][v].get("weight", 0) < attrs.get("weight", 0.5):
+                simple_graph.add_edge(u, v, weight=attrs.get("weight", 0.5))
+        
+        # Apply community detection based on selected method
+        if method == "label_propagation":
+            communities = nx.algorithms.community.label_propagation.label_propagation_communities(simple_graph)
+        else:
+            # Louvain, also the default
+            communities = nx.community.louvain_communities(simple_graph, weight="weight", resolution=1.0)
+        
+        partition = {}
+        for i, community in enumerate(communities):
+            for node in community:
+                partition[node] = i
+        
+        # Count communities
+        community_counts = {}
+        for node, community_id in partition.items():
+            if community_id not in community_counts:
+                community_counts[community_id] = 0
+            community_counts[community_id] += 1
+        
+        # Group results by layer and community
+        community_nodes = {}
+        for node, community_id in partition.items():
+            layer = self._node_layer.get(node)
+            if layer is None:
+                continue
                 
-                if comm_data["risks"]:
-                    risk_communities.append({
-                        "id": comm_id,
-                        "size": len(comm_data["risks"]),
-                        "nodes": comm_data["risks"]
-                    })
+            attrs = self._node_attrs[node]
+            
+            if community_id not in community_nodes:
+                community_nodes[community_id] = {
+                    "id": community_id,
+                    "size": community_counts[community_id],
+                    "entities": [],
+                    "events": [],
+                    "risks": []
+                }
             
-            # Sort communities by size
-            entity_communities.sort(key=lambda x: x["size"], reverse=True)
-            event_communities.sort(key=lambda x: x["size"], reverse=True)
-            risk_communities.sort(key=lambda x: x["size"], reverse=True)
+            node_info = {"id": node}
             
-            # Add to results
-            results["entity"] = entity_communities
-            results["event"] = event_communities
-            results["risk"] = risk_communities
-            results["combined"] = sorted(list(community_nodes.values()), key=lambda x: x["size"], reverse=True)
+            # Add layer-specific information
+            if layer == "entity":
+                node_info.update({
+                    "name": attrs.get("name", "Unknown"),
+                    "type": attrs.get("entity_type", ""),
+                    "subtype": attrs.get("subtype", "")
+                })
+                community_nodes[community_id]["entities"].append(node_info)
+            
+            elif layer == "event":
+                node_info.update({
+                    "title": attrs.get("title", "Unknown"),
+                    "type": attrs.get("event_type", ""),
+                    "date": attrs.get("event_date", "")
+                })
+                community_nodes[community_id]["events"].append(node_info)
+            
+            elif layer == "risk":
+                node_info.update({
+                    "title": attrs.get("title", "Unknown"),
+                    "type": attrs.get("risk_type", ""),
+                    "severity": attrs.get("severity", 1)
+                })
+                community_nodes[community_id]["risks"].append(node_info)
         
-        except Exception as e:
-            logger.error(f"Error detecting communities with {method}: {e}")
+        # Process communities by layer
+        entity_communities = []
+        event_communities = []
+        risk_communities = []
         
-        return results
+        for comm_id, comm_data in community_nodes.items():
+            if comm_data["entities"]:
+                entity_communities.append({
+                    "id": comm_id,
+                    "size": len(comm_data["entities"]),
+                    "nodes": comm_data["entities"]
+                })
+            
+            if comm_data["events"]:
+                event_communities.append({
+                    "id": comm_id,
+                    "size": len(comm_data["events"]),
+                    "nodes": comm_data["events"]
+                })
+            
+            if comm_data["risks"]:
+                risk_communities.append({
+                    "id": comm_id,
+                    "size": len(comm_data["risks"]),
+                    "nodes": comm_data["risks"]
+                })
+        
+        # Sort by size; the stable sort keeps detection order among equal sizes
+        return {
+            "entity": sorted(entity_communities, key=lambda x: x["size"], reverse=True),
+            "event": sorted(event_communities, key=lambda x: x["size"], reverse=True),
+            "risk": sorted(risk_communities, key=lambda x: x["size"], reverse=True),
+            "combined": sorted(community_nodes.values(), key=lambda x: x["size"], reverse=True)
+        }
     
     def find_paths(self, source_id: str, target_id: str, max_length: int = 3) -> List[Dict[str, Any]]:
         """
@@ -766,107 +1503,219 @@ class GraphBuilder:
             if not self.graph.nodes:
                 self.build_complete_graph()
             
-            # Check if both nodes exist
-            if source_id not in self.graph.nodes or target_id not in self.graph.nodes:
-                return paths
-            
-            # Create a simplified graph for path finding
-            simple_graph = nx.DiGraph()
-            
-            # Add nodes and edges from the main graph
-            for n, attrs in self.graph.nodes(data=True):
-                simple_graph.add_node(n, **attrs)
-            
-            for u, v, attrs in self.graph.edges(data=True):
-                # Add edge with weight
-                simple_graph.add_edge(u, v, **attrs)
-            
-            # Find all simple paths within max_length
-            all_paths = []
+            # Results are cached per graph version; copy so callers cannot modify the cached paths
+            paths = copy.deepcopy(self._find_paths_cached(source_id, target_id, max_length, self._graph_version))
+        
+        except Exception as e:
+            logger.error("Error finding paths between %s and %s: %s", source_id, target_id, e)
+        
+        return paths
+    
+    def _find_paths_impl(self, source_id: str, target_id: str, max_length: int,
+                         graph_version: int) -> List[Dict[str, Any]]:
+        """
+        Find and format the paths between two nodes.
+        
+        Errors propagate so that lru_cache does not memoize them.
+        
+        Args:
+            source_id: Source node ID
+            target_id: Target node ID
+            max_length: Maximum path length
+            graph_version: Graph version the result is cached under
             
+        Returns:
+            List of paths found
+        """
+        paths = []
+        
+        # Check if both nodes exist
+        if source_id not in self.graph.nodes or target_id not in self.graph.nodes:
+            return paths
+        
+        # Find all simple paths within max_length
+        all_paths = []
+        
+        try:
+            all_paths = self._simple_paths(source_id, target_id, max_length)
+        except nx.NetworkXNoPath:
+            # Try reverse direction
             try:
-                all_paths = list(nx.all_simple_paths(simple_graph, source_id, target_id, cutoff=max_length))
+                all_paths = self._simple_paths(target_id, source_id, max_length)
+                # Reverse paths
+                all_paths = [list(reversed(p)) for p in all_paths]
             except nx.NetworkXNoPath:
-                # Try reverse direction
-                try:
-                    all_paths = list(nx.all_simple_paths(simple_graph, target_id, source_id, cutoff=max_length))
-                    # Reverse paths
-                    all_paths = [list(reversed(p)) for p in all_paths]
-                except:
-                    pass
-            
-            # Format each path
-            for path in all_paths:
-                path_data = {
-                    "nodes": [],
-                    "edges": [],
-                    "length": len(path) - 1
-                }
+                pass
+        
+        # Format each path
+        for path in all_paths:
+            path_data = {
+                "nodes": [],
+                "edges": [],
+                "length": len(path) - 1
+            }
+            
+            # Add nodes
+            for node_id in path:
+                attrs = self._node_attrs[node_id]
+                layer = self._node_layer[node_id]
                 
-                # Add nodes
-                for node_id in path:
-                    attrs = self.graph.nodes[node_id]
-                    layer = attrs.get("layer", "unknown")
-                    
-                    node_info = {"id": node_id, "layer": layer}
-                    
-                    # Add layer-specific information
-                    if layer == "entity":
-                        node_info.update({
-                            "name": attrs.get("name", "Unknown"),
-                            "type": attrs.get("entity_type", "")
-                        })
-                    elif layer == "event":
-                        node_info.update({
-                            "title": attrs.get("title", "Unknown"),
-                            "type": attrs.get("event_type", "")
-                        })
-                    elif layer == "risk":
-                        node_info.update({
-                            "title": attrs.get("title", "Unknown"),
-                            "type": attrs.get("risk_type", "")
-                        })
-                    
-                    path_data["nodes"].append(node_info)
+                node_info = {"id": node_id, "layer": layer}
                 
-                # Add edges
-                for i in range(len(path) - 1):
-                    u, v = path[i], path[i+1]
-                    
-                    # Get edge data from graph
-                    if simple_graph.has_edge(u, v):
-                        edge_attrs = simple_graph[u][v]
+                # Add layer-specific information
+                if layer == "entity":
+                    node_info.update({
+                        "name": attrs.get("name", "Unknown"),
+                        "type": attrs.get("entity_type", "")
+                    })
+                elif layer == "event":
+                    node_info.update({
+                        "title": attrs.get("title", "Unknown"),
+                        "type": attrs.get("event_type", "")
+                    })
+                elif layer == "risk":
+                    node_info.update({
+                        "title": attrs.get("title", "Unknown"),
+                        "type": attrs.get("risk_type", "")
+                    })
+                
+                path_data["nodes"].append(node_info)
+            
+            # Add edges
+            for i in range(len(path) - 1):
+                u, v = path[i], path[i+1]
+                
+                # Get edge data from graph
+                if self.graph.has_edge(u, v):
+                    edge_attrs = self.graph[u][v]
+                    edge_info = {
+                        "source": u,
+                        "target": v,
+                        "type": edge_attrs.get("type", "connected_to"),
+                        "layer": edge_attrs.get("layer", "unknown")
+                    }
+                    path_data["edges"].append(edge_info)
+                else:
+                    # If edge doesn't exist in this direction, check reverse
+                    if self.graph.has_edge(v, u):
+                        edge_attrs = self.graph[v][u]
                         edge_info = {
-                            "source": u,
-                            "target": v,
+                            "source": v,
+                            "target": u,
                             "type": edge_attrs.get("type", "connected_to"),
-                            "layer": edge_attrs.get("layer", "unknown")
+                            "layer": edge_attrs.get("layer", "unknown"),
+                            "reversed": True
                         }
                         path_data["edges"].append(edge_info)
-                    else:
-                        # If edge doesn't exist in this direction, check reverse
-                        if simple_graph.has_edge(v, u):
-                            edge_attrs = simple_graph[v][u]
-                            edge_info = {
-                                "source": v,
-                                "target": u,
-                                "type": edge_attrs.get("type", "connected_to"),
-                                "layer": edge_attrs.get("layer", "unknown"),
-                                "reversed": True
-                            }
-                            path_data["edges"].append(edge_info)
-                
-                paths.append(path_data)
             
-            # Sort paths by length
-            paths.sort(key=lambda x: x["length"])
+            paths.append(path_data)
         
-        except Exception as e:
-            logger.error(f"Error finding paths between {source_id} and {target_id}: {e}")
+        # Sort paths by length
+        paths.sort(key=lambda x: x["length"])
         
         return paths
     
-    def search_entities(self, term: str) -> List[Dict[str, Any]]:
+    def _simple_paths(self, source: str, target: str, cutoff: int) -> List[List[str]]:
+        """
+        Find all simple paths between two nodes of the combined graph.
+        
+        Short searches use a plain depth-first search; longer ones switch to
+        the meet-in-the-middle search, which explores far fewer branches.
+        
+        Args:
+            source: Source node ID
+            target: Target node ID
+            cutoff: Maximum path length in edges
+            
+        Returns:
+            List of paths, each a list of node IDs
+        """
+        if source == target or cutoff < 1:
+            return []
+        
+        adj = self.graph._adj
+        
+        # One- and two-edge paths are direct adjacency checks
+        if cutoff == 1:
+            return [[source, target]] if target in adj[source] else []
+        if cutoff == 2:
+            paths = []
+            for mid in adj[source]:
+                if mid == target:
+                    paths.append([source, target])
+                elif mid != source and target in adj[mid]:
+                    paths.append([source, mid, target])
+            return paths
+        
+        if cutoff <= 3:
+            return list(self._simple_paths_fast(source, target, cutoff))
+        return _bidir_simple_paths(self.graph, source, target, cutoff)
+    
+    def _simple_paths_fast(self, source: str, target: str, cutoff: int):
+        """
+        Enumerate simple paths with an iterative depth-first search.
+        
+        Args:
+            source: Source node ID
+            target: Target node ID
+            cutoff: Maximum path length in edges
+            
+        Yields:
+            Paths as lists of node IDs
+        """
+        if source == target or cutoff < 1:
+            return
+        
+        adj = self.graph._adj
+        visited = dict.fromkeys([source])
+        stack = [iter(adj[source])]
+        
+        while stack:
+            children = stack[-1]
+            child = next(children, None)
+            
+            if child is None:
+                stack.pop()
+                visited.popitem()
+            elif len(visited) < cutoff:
+                if child in visited:
+                    continue
+                if child == target:
+                    yield list(visited) + [target]
+                else:
+                    visited[child] = None
+                    stack.append(iter(adj[child]))
+            else:
+                # Only the final edge to the target fits within the cutoff
+                if child == target or target in children:
+                    yield list(visited) + [target]
+                stack.pop()
+                visited.popitem()
+    
+    def _search_index(self, collection: str, fields) -> _SearchIndex:
+        """
+        Get the search index of a data store collection, rebuilding it if stale.
+        
+        Args:
+            collection: Data store collection name ("entities", "events", "risks")
+            fields: Function returning the searchable text fields of an object
+            
+        Returns:
+            Search index of the collection
+        """
+        items = getattr(self.data_store, collection)
+        key = (self.data_store.revisions[collection], len(items))
+        
+        cached = self._search_indexes.get(collection)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        values = list(items.values())
+        index = _SearchIndex(values, [fields(item) for item in values])
+        self._search_indexes[collection] = (key, index)
+        return index
+    
+    def search_entities(self, term: str) -> List[EntityHit]:
         """
         Search for entities by name.
         
@@ -882,27 +1731,27 @@ class GraphBuilder:
             # Case-insensitive search
             term = term.lower()
             
-            entities = self.data_store.get_all_entities()
-            
-            for entity in entities:
-                if term in entity.name.lower():
-                    results.append({
-                        "id": entity.id,
-                        "name": entity.name,
-                        "type": entity.type,
-                        "subtype": entity.subtype,
-                        "mentions": len(entity.mentions)
-                    })
+            index = self._search_index("entities", lambda entity: (entity.name,))
             
             # Sort by relevance (exact match first, then by mentions)
-            results.sort(key=lambda x: (0 if x["name"].lower() == term else 1, -x["mentions"]))
+            hits = index.search(term)
+            hits.sort(key=lambda hit: (0 if hit[1][0] == term else 1, -len(hit[0].mentions)))
+            
+            for entity, _ in hits:
+                results.append(EntityHit(
+                    id=entity.id,
+                    name=entity.name,
+                    type=entity.type,
+                    subtype=entity.subtype,
+                    mentions=len(entity.mentions)
+                ))
         
         except Exception as e:
-            logger.error(f"Error searching entities for '{term}': {e}")
+            logger.error("Error searching entities for '%s': %s", term, e)
         
         return results
     
-    def search_events(self, term: str) -> List[Dict[str, Any]]:
+    def search_events(self, term: str) -> List[EventHit]:
         """
         Search for events by title or description.
         
@@ -918,28 +1767,73 @@ class GraphBuilder:
             # Case-insensitive search
             term = term.lower()
             
-            events = self.data_store.get_all_events()
-            
-            for event in events:
-                if term in event.title.lower() or term in event.description.lower():
-                    results.append({
-                        "id": event.id,
-                        "title": event.title,
-                        "description": event.description,
-                        "type": event.event_type,
-                        "date": event.event_date.isoformat(),
-                        "entities": len(event.entities)
-                    })
+            index = self._search_index("events", lambda event: (event.title, event.description))
+            results = self._rank_event_hits(term, index.search(term))
+        
+        except Exception as e:
+            logger.error("Error searching events for '%s': %s", term, e)
+        
+        return results
+    
+    def search_events_multi(self, terms: List[str]) -> Dict[str, List[EventHit]]:
+        """
+        Search for events matching any of several terms in one pass.
+        
+        Args:
+            terms: Search terms
             
-            # Sort by relevance (title match first, then description)
-            results.sort(key=lambda x: (0 if term in x["title"].lower() else 1, x["date"], -x["entities"]))
+        Returns:
+            Dictionary mapping each term to its list of matching events
+        """
+        results = {}
+        
+        try:
+            # Case-insensitive search
+            lowered = {term: term.lower() for term in terms}
+            
+            index = self._search_index("events", lambda event: (event.title, event.description))
+            matches = index.search_many(set(lowered.values()))
+            
+            for term, term_lc in lowered.items():
+                results[term] = self._rank_event_hits(term_lc, matches[term_lc])
         
         except Exception as e:
-            logger.error(f"Error searching events for '{term}': {e}")
+            logger.error("Error searching events for %s: %s", terms, e)
         
         return results
     
-    def search_risks(self, term: str) -> List[Dict[str, Any]]:
+    def _rank_event_hits(self, term: str, matches: List[Tuple[Any, Tuple[str, ...]]]) -> List[EventHit]:
+        """
+        Build and rank the event search results for a term.
+        
+        Args:
+            term: Lowercased search term
+            matches: (event, lowercased fields) pairs from the search index
+            
+        Returns:
+            List of matching events
+        """
+        results = []
+        title_matches = []
+        for event, (title, _) in matches:
+            title_matches.append(term in title)
+            results.append(EventHit(
+                id=event.id,
+                title=event.title,
+                description=event.description,
+                type=event.event_type,
+                date=event.event_date.isoformat(),
+                entities=len(event.entities)
+            ))
+        
+        # Sort by relevance (title match first, then description)
+        order = sorted(
+            range(len(results)),
+            key=lambda i: (0 if title_matches[i] else 1, results[i].date, -results[i].entities)
+        )
+        return [results[i] for i in order]
+    
+    def search_risks(self, term: str) -> List[RiskHit]:
         """
         Search for risks by title or description.
         
@@ -955,23 +1849,28 @@ class GraphBuilder:
             # Case-insensitive search
             term = term.lower()
             
-            risks = self.data_store.get_all_risks()
-            
-            for risk in risks:
-                if term in risk.title.lower() or term in risk.description.lower():
-                    results.append({
-                        "id": risk.id,
-                        "title": risk.title,
-                        "description": risk.description,
-                        "type": risk.risk_type,
-                        "severity": risk.severity,
-                        "likelihood": risk.likelihood
-                    })
+            index = self._search_index("risks", lambda risk: (risk.title, risk.description))
+            
+            title_matches = []
+            for risk, (title, _) in index.search(term):
+                title_matches.append(term in title)
+                results.append(RiskHit(
+                    id=risk.id,
+                    title=risk.title,
+                    description=risk.description,
+                    type=risk.risk_type,
+                    severity=risk.severity,
+                    likelihood=risk.likelihood
+                ))
             
             # Sort by relevance (title match first, then by severity and likelihood)
-            results.sort(key=lambda x: (0 if term in x["title"].lower() else 1, -x["severity"], -x["likelihood"]))
+            order = sorted(
+                range(len(results)),
+                key=lambda i: (0 if title_matches[i] else 1, -results[i].severity, -results[i].likelihood)
+            )
+            results = [results[i] for i in order]
         
         except Exception as e:
-            logger.error(f"Error searching risks for '{term}': {e}")
+            logger.error("Error searching risks for '%s': %s", term, e)
         
         return results
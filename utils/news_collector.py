@@ -4,14 +4,122 @@ News collection module for gathering financial news from various sources.
 import logging
 import requests
 import feedparser
+import io
+import json
+import xml.etree.ElementTree as ElementTree
 from datetime import datetime
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 
+# Use orjson for decoding API responses when it is installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+def _parse_atom_entries(content: bytes) -> List[feedparser.FeedParserDict]:
+    """
+    Parse the entries of an Atom feed with the C-accelerated ElementTree parser.
+    
+    Entries are returned as FeedParserDicts with the fields feedparser would
+    give them: title, summary, link, updated/updated_parsed, and one key per
+    child of <content> (e.g. SEC EDGAR's filing-date and filing-type). Falls
+    back to feedparser if the document is not well-formed XML.
+    
+    Args:
+        content: Raw feed document
+        
+    Returns:
+        List of feed entries
+    """
+    entries = []
+    
+    try:
+        for _, elem in ElementTree.iterparse(io.BytesIO(content), events=('end',)):
+            if elem.tag != ATOM_NS + 'entry':
+                continue
+            
+            entry = feedparser.FeedParserDict()
+            for child in elem:
+                name = child.tag.rpartition('}')[2]
+                
+                if name == 'link':
+                    if child.get('rel', 'alternate') == 'alternate' and 'link' not in entry:
+                        entry['link'] = child.get('href', '')
+                elif name == 'content':
+                    for field in child:
+                        entry[field.tag.rpartition('}')[2]] = (field.text or '').strip()
+                elif name == 'updated':
+                    entry['updated'] = (child.text or '').strip()
+                    try:
+                        entry['updated_parsed'] = datetime.fromisoformat(entry['updated']).utctimetuple()
+                    except ValueError:
+                        pass
+                elif name in ('title', 'summary', 'id'):
+                    entry[name] = (child.text or '').strip()
+            
+            # Like feedparser, use the entry ID when there is no link
+            if 'link' not in entry and 'id' in entry:
+                entry['link'] = entry['id']
+            
+            entries.append(entry)
+            
+            # Free the parsed entry to bound memory on large feeds
+            elem.clear()
+    
+    except ElementTree.ParseError as e:
+        logger.warning("Falling back to feedparser for malformed feed: %s", e)
+        return feedparser.parse(content).entries
+    
+    return entries
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of stored tokens
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """
+        Block until a token is available and take it.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait)
+
+
 class NewsCollector:
     """
     Collects financial news articles from RSS feeds and APIs
@@ -27,6 +135,20 @@ class NewsCollector:
         """
         self.data_store = data_store
         
+        # Shared HTTP session so connections to each API host are reused
+        self.session = requests.Session()
+        
+        # Collectors by source type and by API source name
+        self._source_handlers = {
+            'rss': self._collect_from_rss,
+            'api': self._collect_from_api
+        }
+        self._api_handlers = {
+            'Alpha Vantage': self._collect_from_alpha_vantage,
+            'FRED Economic Data': self._collect_from_fred,
+            'SEC Edgar': self._collect_from_sec_edgar
+        }
+        
     def collect_from_source(self, source_config: Dict[str, Any], 
                             start_date: datetime, end_date: datetime) -> List[str]:
         """
@@ -40,23 +162,22 @@ class NewsCollector:
         Returns:
             List of collected news IDs
         """
-        logger.info(f"Collecting news from {source_config['name']} between {start_date} and {end_date}")
+        logger.info("Collecting news from %s between %s and %s", source_config['name'], start_date, end_date)
         
         collected_ids = []
         
         try:
-            if source_config['type'] == 'rss':
-                collected_ids = self._collect_from_rss(source_config, start_date, end_date)
-            elif source_config['type'] == 'api':
-                collected_ids = self._collect_from_api(source_config, start_date, end_date)
+            handler = self._source_handlers.get(source_config['type'])
+            if handler:
+                collected_ids = handler(source_config, start_date, end_date)
             else:
-                logger.warning(f"Unsupported source type: {source_config['type']}")
+                logger.warning("Unsupported source type: %s", source_config['type'])
                 
-            logger.info(f"Collected {len(collected_ids)} news items from {source_config['name']}")
+            logger.info("Collected %s news items from %s", len(collected_ids), source_config['name'])
             return collected_ids
             
         except Exception as e:
-            logger.error(f"Error collecting news from {source_config['name']}: {e}")
+            logger.error("Error collecting news from %s: %s", source_config['name'], e)
             return []
     
     def _collect_from_rss(self, source_config: Dict[str, Any], 
@@ -72,57 +193,58 @@ class NewsCollector:
         Returns:
             List of collected news IDs
         """
-        collected_ids = []
+        pending = []
         
         # Parse the RSS feed
         feed = feedparser.parse(source_config['rss_url'])
         
         if feed.bozo:
-            logger.warning(f"RSS feed error: {feed.bozo_exception}")
+            logger.warning("RSS feed error: %s", feed.bozo_exception)
         
         # Process each entry
         for entry in feed.entries:
             try:
+                # Look up each field once
+                published_parsed = entry.get('published_parsed')
+                updated_parsed = entry.get('updated_parsed')
+                
                 # Parse published date
-                if hasattr(entry, 'published_parsed'):
-                    pub_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                elif hasattr(entry, 'updated_parsed'):
-                    pub_date = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
+                if published_parsed is not None:
+                    pub_date = datetime.fromtimestamp(time.mktime(published_parsed))
+                elif updated_parsed is not None:
+                    pub_date = datetime.fromtimestamp(time.mktime(updated_parsed))
                 else:
                     # If no date is available, use current time but mark as uncertain
                     pub_date = datetime.now()
-                    logger.warning(f"No date found for entry {entry.title}, using current time")
+                    logger.warning("No date found for entry %s, using current time", entry.title)
                 
                 # Filter by date range
                 if start_date <= pub_date <= end_date:
                     # Create news item
-                    content = entry.summary if hasattr(entry, 'summary') else ''
+                    content = entry.get('summary', '')
                     
                     # If there's a longer content available, use it
-                    if hasattr(entry, 'content'):
-                        for content_item in entry.content:
-                            if content_item.value and len(content_item.value) > len(content):
-                                content = content_item.value
+                    content_items = entry.get('content')
+                    if content_items is not None:
+                        # max keeps the first longest, so the summary wins ties
+                        content = max((content, *(item.value for item in content_items if item.value)), key=len)
                     
                     # Extract URL
-                    url = entry.link if hasattr(entry, 'link') else ''
+                    url = entry.get('link', '')
                     
-                    # Create and save news item
-                    news_id = self._save_news_item(
+                    # Queue the news item; the batch is saved at the end
+                    pending.append(self._create_news_item(
                         title=entry.title,
                         content=content,
                         source=source_config['name'],
                         url=url,
                         published_at=pub_date
-                    )
-                    
-                    if news_id:
-                        collected_ids.append(news_id)
+                    ))
             
             except Exception as e:
-                logger.error(f"Error processing RSS entry: {e}")
+                logger.error("Error processing RSS entry: %s", e)
         
-        return collected_ids
+        return self._save_news_items(pending)
     
     def _collect_from_api(self, source_config: Dict[str, Any], 
                          start_date: datetime, end_date: datetime) -> List[str]:
@@ -140,14 +262,11 @@ class NewsCollector:
         collected_ids = []
         
         # Handle specific API types
-        if source_config['name'] == 'Alpha Vantage':
-            collected_ids = self._collect_from_alpha_vantage(source_config, start_date, end_date)
-        elif source_config['name'] == 'FRED Economic Data':
-            collected_ids = self._collect_from_fred(source_config, start_date, end_date)
-        elif source_config['name'] == 'SEC Edgar':
-            collected_ids = self._collect_from_sec_edgar(source_config, start_date, end_date)
+        handler = self._api_handlers.get(source_config['name'])
+        if handler:
+            collected_ids = handler(source_config, start_date, end_date)
         else:
-            logger.warning(f"Unsupported API source: {source_config['name']}")
+            logger.warning("Unsupported API source: %s", source_config['name'])
         
         return collected_ids
     
@@ -164,7 +283,7 @@ class NewsCollector:
         Returns:
             List of collected news IDs
         """
-        collected_ids = []
+        pending = []
         api_key = source_config.get('api_key', '')
         
         if not api_key:
@@ -174,54 +293,73 @@ class NewsCollector:
         # Define major market indices to track news for
         tickers = ['SPY', 'QQQ', 'DIA', 'IWM', 'VGK', 'EEM', 'GLD', 'TLT']
         
-        for ticker in tickers:
-            try:
-                # Make API request for news sentiment
-                url = f"{source_config['api_url']}?function=NEWS_SENTIMENT&tickers={ticker}&apikey={api_key}"
-                response = requests.get(url)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Process each news item
-                    feed = data.get('feed', [])
-                    for item in feed:
-                        try:
-                            # Parse the time
-                            time_published = item.get('time_published', '')
-                            if time_published:
-                                # Format is typically YYYYMMDDTHHMMSS
-                                pub_date = datetime.strptime(time_published, '%Y%m%dT%H%M%S')
-                            else:
-                                pub_date = datetime.now()
-                            
-                            # Filter by date range
-                            if start_date <= pub_date <= end_date:
-                                # Save the news item
-                                news_id = self._save_news_item(
-                                    title=item.get('title', 'Untitled'),
-                                    content=item.get('summary', ''),
-                                    source=f"Alpha Vantage ({item.get('source', 'unknown')})",
-                                    url=item.get('url', ''),
-                                    published_at=pub_date
-                                )
-                                
-                                if news_id:
-                                    collected_ids.append(news_id)
+        # Respect API rate limits; the free tier allows 5 requests per minute
+        bucket = TokenBucket(source_config.get('requests_per_minute', 5) / 60.0)
+        
+        # Fetch the ticker feeds concurrently and save the items as they arrive
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            feeds = executor.map(
+                lambda ticker: self._fetch_alpha_vantage_feed(source_config, api_key, ticker, bucket),
+                tickers
+            )
+            
+            for feed in feeds:
+                # Process each news item
+                for item in feed:
+                    try:
+                        # Parse the time
+                        time_published = item.get('time_published', '')
+                        if time_published:
+                            # Format is typically YYYYMMDDTHHMMSS
+                            pub_date = datetime.strptime(time_published, '%Y%m%dT%H%M%S')
+                        else:
+                            pub_date = datetime.now()
                         
-                        except Exception as e:
-                            logger.error(f"Error processing Alpha Vantage news item: {e}")
-                
-                else:
-                    logger.warning(f"Alpha Vantage API request failed: {response.status_code}")
-                
-                # Respect API rate limits
-                time.sleep(12)  # Alpha Vantage free tier limits: 5 requests per minute
+                        # Filter by date range
+                        if start_date <= pub_date <= end_date:
+                            # Queue the news item for saving
+                            pending.append(self._create_news_item(
+                                title=item.get('title', 'Untitled'),
+                                content=item.get('summary', ''),
+                                source=f"Alpha Vantage ({item.get('source', 'unknown')})",
+                                url=item.get('url', ''),
+                                published_at=pub_date
+                            ))
+                    
+                    except Exception as e:
+                        logger.error("Error processing Alpha Vantage news item: %s", e)
+        
+        return self._save_news_items(pending)
+    
+    def _fetch_alpha_vantage_feed(self, source_config: Dict[str, Any], api_key: str,
+                                  ticker: str, bucket: TokenBucket) -> List[Dict[str, Any]]:
+        """
+        Fetch the Alpha Vantage news feed for one ticker.
+        
+        Args:
+            source_config: Alpha Vantage API configuration
+            api_key: Alpha Vantage API key
+            ticker: Ticker symbol to get news for
+            bucket: Rate limiter shared by the concurrent requests
             
-            except Exception as e:
-                logger.error(f"Error collecting news from Alpha Vantage for {ticker}: {e}")
+        Returns:
+            List of raw news items
+        """
+        try:
+            # Make API request for news sentiment
+            url = f"{source_config['api_url']}?function=NEWS_SENTIMENT&tickers={ticker}&apikey={api_key}"
+            bucket.acquire()
+            response = self.session.get(url, timeout=10)
+            
+            if response.status_code == 200:
+                return json_loads(response.content).get('feed', [])
+            
+            logger.warning("Alpha Vantage API request failed: %s", response.status_code)
         
-        return collected_ids
+        except Exception as e:
+            logger.error("Error collecting news from Alpha Vantage for %s: %s", ticker, e)
+        
+        return []
     
     def _collect_from_fred(self, source_config: Dict[str, Any], 
                           start_date: datetime, end_date: datetime) -> List[str]:
@@ -236,7 +374,7 @@ class NewsCollector:
         Returns:
             List of collected news IDs
         """
-        collected_ids = []
+        pending = []
         api_key = source_config.get('api_key', '')
         
         if not api_key:
@@ -250,22 +388,28 @@ class NewsCollector:
             
             # Get economic data releases in the specified date range
             url = f"{source_config['api_url']}releases?api_key={api_key}&file_type=json&realtime_start={start_str}&realtime_end={end_str}"
-            response = requests.get(url)
+            response = self.session.get(url)
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 releases = data.get('releases', [])
                 
-                for release in releases:
-                    try:
-                        release_id = release.get('id')
-                        
-                        # Get details for each release
-                        detail_url = f"{source_config['api_url']}release?release_id={release_id}&api_key={api_key}&file_type=json"
-                        detail_response = requests.get(detail_url)
+                # Respect API rate limits (FRED allows 120 requests per minute)
+                bucket = TokenBucket(source_config.get('requests_per_minute', 120) / 60.0)
+                
+                # Fetch the release details concurrently, keeping the release order
+                with ThreadPoolExecutor(max_workers=5) as executor:
+                    details = executor.map(
+                        lambda release: self._fetch_fred_release(source_config, api_key, release.get('id'), bucket),
+                        releases
+                    )
+                    
+                    for release, release_data in zip(releases, details):
+                        if release_data is None:
+                            continue
                         
-                        if detail_response.status_code == 200:
-                            release_data = detail_response.json().get('releases', [{}])[0]
+                        try:
+                            release_id = release.get('id')
                             
                             # Get the release date
                             release_date_str = release.get('date', '')
@@ -281,31 +425,52 @@ class NewsCollector:
                             
                             content = f"{notes}\n\n{press_release}"
                             
-                            # Save as news item
-                            news_id = self._save_news_item(
+                            # Queue as news item for saving
+                            pending.append(self._create_news_item(
                                 title=f"FRED: {name}",
                                 content=content,
                                 source="FRED Economic Data",
                                 url=f"https://fred.stlouisfed.org/releases/show/{release_id}",
                                 published_at=release_date
-                            )
-                            
-                            if news_id:
-                                collected_ids.append(news_id)
+                            ))
                         
-                        # Respect API rate limits
-                        time.sleep(0.5)
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing FRED release: {e}")
+                        except Exception as e:
+                            logger.error("Error processing FRED release: %s", e)
             
             else:
-                logger.warning(f"FRED API request failed: {response.status_code}")
+                logger.warning("FRED API request failed: %s", response.status_code)
         
         except Exception as e:
-            logger.error(f"Error collecting data from FRED: {e}")
+            logger.error("Error collecting data from FRED: %s", e)
         
-        return collected_ids
+        return self._save_news_items(pending)
+    
+    def _fetch_fred_release(self, source_config: Dict[str, Any], api_key: str,
+                            release_id: Any, bucket: TokenBucket) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the details of one FRED release.
+        
+        Args:
+            source_config: FRED API configuration
+            api_key: FRED API key
+            release_id: FRED release ID
+            bucket: Rate limiter shared by the concurrent requests
+            
+        Returns:
+            Release details, or None if the request failed
+        """
+        try:
+            detail_url = f"{source_config['api_url']}release?release_id={release_id}&api_key={api_key}&file_type=json"
+            bucket.acquire()
+            detail_response = self.session.get(detail_url)
+            
+            if detail_response.status_code == 200:
+                return json_loads(detail_response.content).get('releases', [{}])[0]
+        
+        except Exception as e:
+            logger.error("Error fetching FRED release %s: %s", release_id, e)
+        
+        return None
     
     def _collect_from_sec_edgar(self, source_config: Dict[str, Any], 
                                start_date: datetime, end_date: datetime) -> List[str]:
@@ -320,7 +485,7 @@ class NewsCollector:
         Returns:
             List of collected news IDs
         """
-        collected_ids = []
+        pending = []
         
         try:
             # Convert dates to YYYYMMDD format
@@ -348,78 +513,78 @@ class NewsCollector:
                 }
                 
                 # Make request to EDGAR
-                response = requests.get(source_config['api_url'], params=params, headers=headers)
+                response = self.session.get(source_config['api_url'], params=params, headers=headers)
                 
                 if response.status_code == 200:
-                    # Parse response as feed
-                    feed = feedparser.parse(response.content)
-                    
-                    for entry in feed.entries:
+                    # Parse response as an Atom feed
+                    for entry in _parse_atom_entries(response.content):
                         try:
-                            # Get filing details
-                            title = entry.title if hasattr(entry, 'title') else f"SEC Filing: {form_type}"
+                            # Get filing details, looking up each field once
+                            title = entry.get('title', f"SEC Filing: {form_type}")
+                            filing_date_str = entry.get('filing-date')
+                            updated_parsed = entry.get('updated_parsed')
+                            summary = entry.get('summary')
+                            filing_type = entry.get('filing-type')
+                            company = entry.get('company-name')
+                            cik = entry.get('cik')
                             
                             # Parse the filing date
-                            if hasattr(entry, 'filing-date'):
-                                filing_date = datetime.strptime(entry['filing-date'], '%Y-%m-%d')
-                            elif hasattr(entry, 'updated_parsed'):
-                                filing_date = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
+                            if filing_date_str is not None:
+                                filing_date = datetime.strptime(filing_date_str, '%Y-%m-%d')
+                            elif updated_parsed is not None:
+                                filing_date = datetime.fromtimestamp(time.mktime(updated_parsed))
                             else:
                                 filing_date = datetime.now()
                             
                             # Get company details
-                            company = entry.get('company-name', '')
                             if company:
                                 title = f"{company} - {title}"
                             
                             # Build content from filing details
                             content_parts = []
                             
-                            if hasattr(entry, 'summary'):
-                                content_parts.append(entry.summary)
+                            if summary is not None:
+                                content_parts.append(summary)
                             
-                            if hasattr(entry, 'filing-type'):
-                                content_parts.append(f"Filing Type: {entry['filing-type']}")
+                            if filing_type is not None:
+                                content_parts.append(f"Filing Type: {filing_type}")
                             
-                            if hasattr(entry, 'company-name'):
-                                content_parts.append(f"Company: {entry['company-name']}")
+                            if company is not None:
+                                content_parts.append(f"Company: {company}")
                             
-                            if hasattr(entry, 'cik'):
-                                content_parts.append(f"CIK: {entry['cik']}")
+                            if cik is not None:
+                                content_parts.append(f"CIK: {cik}")
                             
                             # Get the filing URL
-                            url = entry.link if hasattr(entry, 'link') else ''
+                            url = entry.get('link', '')
                             
-                            # Save as news item
-                            news_id = self._save_news_item(
+                            # Queue as news item for saving
+                            pending.append(self._create_news_item(
                                 title=title,
                                 content="\n\n".join(content_parts),
                                 source="SEC EDGAR",
                                 url=url,
                                 published_at=filing_date
-                            )
-                            
-                            if news_id:
-                                collected_ids.append(news_id)
+                            ))
                         
                         except Exception as e:
-                            logger.error(f"Error processing SEC EDGAR entry: {e}")
+                            logger.error("Error processing SEC EDGAR entry: %s", e)
                 
                 else:
-                    logger.warning(f"SEC EDGAR request failed: {response.status_code}")
+                    logger.warning("SEC EDGAR request failed: %s", response.status_code)
                 
                 # Respect SEC EDGAR rate limits
                 time.sleep(0.1)
         
         except Exception as e:
-            logger.error(f"Error collecting from SEC EDGAR: {e}")
+            logger.error("Error collecting from SEC EDGAR: %s", e)
         
-        return collected_ids
+        return self._save_news_items(pending)
     
-    def _save_news_item(self, title: str, content: str, source: str, 
-                       url: str, published_at: datetime) -> Optional[str]:
+    def _create_news_item(self, title: str, content: str, source: str,
+                          url: str, published_at: datetime):
         """
-        Create and save a news item to the data store.
+        Create a news item to be saved with the rest of its batch.
         
         Args:
             title: News title
@@ -429,31 +594,36 @@ class NewsCollector:
             published_at: Publication date
             
         Returns:
-            News ID if saved successfully, None otherwise
+            New NewsItem object
         """
-        try:
-            # Check for duplicate news based on URL or title
-            existing_news = self.data_store.find_news_by_url(url)
-            
-            if existing_news:
-                logger.info(f"Skipping duplicate news: {title}")
-                return existing_news.id
-            
-            # Create new news item
-            from models import NewsItem
-            news_item = NewsItem.create(
-                title=title,
-                content=content,
-                source=source,
-                url=url,
-                published_at=published_at
-            )
-            
-            # Save to data store
-            self.data_store.save_news(news_item)
+        from models import NewsItem
+        return NewsItem.create(
+            title=title,
+            content=content,
+            source=source,
+            url=url,
+            published_at=published_at
+        )
+    
+    def _save_news_items(self, news_items: List[Any]) -> List[str]:
+        """
+        Save a batch of collected news items to the data store.
+        
+        Items whose URL is already stored are skipped, and the stored item's
+        ID is returned in their place.
+        
+        Args:
+            news_items: NewsItem objects to save
             
-            return news_item.id
+        Returns:
+            List of news IDs, one per item
+        """
+        if not news_items:
+            return []
+        
+        try:
+            return self.data_store.save_news_bulk(news_items)
         
         except Exception as e:
-            logger.error(f"Error saving news item: {e}")
-            return None
+            logger.error("Error saving news items: %s", e)
+            return []
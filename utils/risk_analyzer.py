@@ -1,16 +1,450 @@
 """
 Risk analysis module for identifying financial risks from events.
 """
+import copy
 import logging
 import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse import csgraph
 from typing import List, Dict, Any, Set, Tuple, Optional
 from datetime import datetime
+from types import MappingProxyType
 import re
+import functools
+import heapq
 import itertools
+import operator
+from collections import Counter, defaultdict, namedtuple
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Risk patterns for different risk categories
+_RISK_PATTERNS = {
+    "Market Risk Event": [
+        r"(market|stock|index|bond)\s+(crash|collapse|volatility|correction)",
+        r"(interest rate|yield|spread)\s+(rise|increase|jump|spike|volatility)",
+        r"(bull|bear)\s+market",
+        r"market\s+uncertainty",
+        r"(valuation|bubble|overvaluation|undervaluation)"
+    ],
+    "Credit Risk Event": [
+        r"(default|bankruptcy|insolvency|restructuring)",
+        r"(debt|loan)\s+(problem|issue|concern)",
+        r"(credit|debt)\s+rating\s+(downgrade|cut|lower)",
+        r"(non-performing|bad)\s+(loan|debt)",
+        r"debt\s+burden"
+    ],
+    "Liquidity Risk Event": [
+        r"(liquidity|cash|funding)\s+(problem|issue|concern|crisis|squeeze)",
+        r"(unable|difficulty)\s+to\s+(raise|secure)\s+(funding|capital|money)",
+        r"(frozen|dry up|seized)\s+(credit|market|funding)",
+        r"(bank|financial)\s+run",
+        r"(withdraw|redemption)\s+surge"
+    ],
+    "Operational Risk Event": [
+        r"(operational|system|technical)\s+(failure|breakdown|outage|disruption)",
+        r"(cyber|security)\s+(attack|breach|incident|threat)",
+        r"(fraud|misconduct|corruption|scandal)",
+        r"(human|employee)\s+error",
+        r"(natural disaster|fire|flood|earthquake|pandemic|supply chain)\s+(disruption|issue)"
+    ],
+    "Legal Risk Event": [
+        r"(lawsuit|litigation|legal action|sue|sued)",
+        r"(fine|penalty|sanction)",
+        r"(regulatory|compliance|legal)\s+(violation|breach|issue|problem)",
+        r"(investigation|probe|inquiry)",
+        r"(settlement|judgment)\s+against"
+    ],
+    "Strategic Risk Event": [
+        r"(strategic|strategy)\s+(failure|mistake|error)",
+        r"(competition|competitor)\s+(pressure|threat)",
+        r"(merger|acquisition|partnership)\s+(failure|problem|issue)",
+        r"(business model|strategy)\s+(change|shift)",
+        r"(enter|exit)\s+(market|business|industry)"
+    ],
+    "Reputation Risk Event": [
+        r"(reputation|reputational)\s+(damage|harm|crisis|issue)",
+        r"(public|customer|consumer)\s+(backlash|criticism|protest)",
+        r"(scandal|controversy)",
+        r"(social media|PR)\s+(crisis|disaster|backlash)",
+        r"(boycott|public relations)\s+issue"
+    ],
+    "Regulatory Risk Event": [
+        r"(regulation|regulatory)\s+(change|reform|tightening|new)",
+        r"(compliance|regulatory)\s+(cost|burden|requirement)",
+        r"(legislation|law|rule)\s+(change|new|proposed)",
+        r"(regulatory|government)\s+(crackdown|enforcement)",
+        r"(license|permit|approval)\s+(revoke|suspend|deny|delay)"
+    ]
+}
+
+# Risk type -> index into _HIERARCHY_LEVELS
+_RISK_TYPE_ID = MappingProxyType({
+    "Market Risk Event": 0,
+    "Credit Risk Event": 1,
+    "Liquidity Risk Event": 2,
+    "Operational Risk Event": 3,
+    "Legal Risk Event": 4,
+    "Strategic Risk Event": 5,
+    "Reputation Risk Event": 6,
+    "Regulatory Risk Event": 7
+})
+
+# Hierarchy level per risk type ID, lower levels typically affect higher ones;
+# the trailing 0 is used for unknown types
+_HIERARCHY_LEVELS = np.array([1, 2, 3, 4, 5, 6, 7, 8, 0], dtype=np.int8)
+
+# Impact areas per risk type
+_IMPACT_AREAS = MappingProxyType({
+    "Market Risk Event": ("Financial Markets", "Investment Performance", "Asset Valuations"),
+    "Credit Risk Event": ("Debt Servicing", "Counterparty Exposure", "Credit Ratings"),
+    "Liquidity Risk Event": ("Cash Flow", "Funding Access", "Asset Liquidity"),
+    "Operational Risk Event": ("Business Operations", "Systems & Technology", "People & Process"),
+    "Legal Risk Event": ("Legal Liability", "Compliance", "Corporate Governance"),
+    "Strategic Risk Event": ("Business Strategy", "Competitive Position", "Business Model"),
+    "Reputation Risk Event": ("Brand Value", "Customer Trust", "Public Perception"),
+    "Regulatory Risk Event": ("Regulatory Compliance", "Policy Environment", "Licensing")
+})
+
+# Impact areas for risk types missing from _IMPACT_AREAS
+_DEFAULT_IMPACT_AREAS = ("Financial", "Operational")
+
+# General explanation per risk type, used in risk descriptions
+_RISK_EXPLANATIONS = MappingProxyType({
+    "Market Risk Event": "Market risk involves potential losses due to market movements and volatility.",
+    "Credit Risk Event": "Credit risk involves potential losses due to counterparty default or credit deterioration.",
+    "Liquidity Risk Event": "Liquidity risk involves potential losses or operational issues due to inability to meet cash flow needs.",
+    "Operational Risk Event": "Operational risk involves potential losses due to failed internal processes, people, systems, or external events.",
+    "Legal Risk Event": "Legal risk involves potential losses due to legal actions, regulatory violations, or contractual issues.",
+    "Strategic Risk Event": "Strategic risk involves potential losses due to failed business decisions or implementation.",
+    "Reputation Risk Event": "Reputation risk involves potential losses due to damage to company image or brand.",
+    "Regulatory Risk Event": "Regulatory risk involves potential losses due to regulatory changes or compliance failures."
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_risk_patterns() -> Dict[str, List[Any]]:
+    """
+    Compile the risk patterns once per process.
+    
+    Patterns are compiled with IGNORECASE and matched against the original text.
+    
+    Returns:
+        Dictionary mapping risk types to compiled patterns
+    """
+    return {
+        risk_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        for risk_type, patterns in _RISK_PATTERNS.items()
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_category_patterns() -> Dict[str, Any]:
+    """
+    Compile one alternation of all patterns per risk category.
+    
+    The fused pattern only tells whether any pattern of the category occurs;
+    scores still come from the individual patterns.
+    
+    Returns:
+        Dictionary mapping risk types to a single compiled alternation
+    """
+    return {
+        risk_type: re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+        for risk_type, patterns in _RISK_PATTERNS.items()
+    }
+
+def _hop_distances(adjacency, sources, targets) -> np.ndarray:
+    """
+    Compute unweighted hop distances from source nodes to target nodes.
+    
+    Args:
+        adjacency: CSR adjacency matrix
+        sources: Row positions to start the BFS from
+        targets: Column positions to keep in the result
+        
+    Returns:
+        Matrix of hop distances (inf if unreachable) of shape (len(sources), len(targets))
+    """
+    hops = csgraph.shortest_path(adjacency, directed=False, unweighted=True, indices=sources)
+    return hops[:, targets]
+
+
+# Match count at which both severity (score / 2, capped at 5) and likelihood
+# (score / 10, capped at 0.9) reach their maximum
+_SATURATING_RISK_SCORE = 10
+
+# Normalized, attribute-safe snapshot of a risk used by the metric and graph loops
+RiskView = namedtuple(
+    'RiskView',
+    'id title risk_type severity likelihood entities events created_day related_risks transmissions'
+)
+
+# Shared read-only default for missing risk attribute mappings
+_EMPTY_MAPPING = MappingProxyType({})
+
+# Marks event IDs missing from the event type index
+_NO_EVENT_TYPE = object()
+
+# Column arrays over the RiskView list: int8 severities (-1 when missing) and float64 likelihoods
+RiskArrays = namedtuple('RiskArrays', 'severity likelihood')
+
+
+def _bidirectional_bfs_path(neighbors: Dict[str, List[str]], source: str, target: str) -> Optional[List[str]]:
+    """
+    Find a shortest path between two nodes of an undirected graph.
+    
+    Expands the smaller BFS fringe from either end until they meet, visiting
+    neighbors in list order. This is the search nx.shortest_path runs for
+    unweighted graphs, so it returns the same path, without the dispatch and
+    graph-view overhead.
+    
+    Args:
+        neighbors: Dictionary mapping nodes to their neighbor lists
+        source: Start node
+        target: End node
+        
+    Returns:
+        List of nodes from source to target, or None if they are not connected
+    """
+    if source == target:
+        return [source]
+    
+    pred = {source: None}
+    succ = {target: None}
+    forward_fringe = [source]
+    reverse_fringe = [target]
+    meeting_node = None
+    
+    while forward_fringe and reverse_fringe and meeting_node is None:
+        if len(forward_fringe) <= len(reverse_fringe):
+            this_level, forward_fringe = forward_fringe, []
+            for node in this_level:
+                for neighbor in neighbors.get(node, ()):
+                    if neighbor not in pred:
+                        forward_fringe.append(neighbor)
+                        pred[neighbor] = node
+                    if neighbor in succ:
+                        meeting_node = neighbor
+                        break
+                if meeting_node is not None:
+                    break
+        else:
+            this_level, reverse_fringe = reverse_fringe, []
+            for node in this_level:
+                for neighbor in neighbors.get(node, ()):
+                    if neighbor not in succ:
+                        succ[neighbor] = node
+                        reverse_fringe.append(neighbor)
+                    if neighbor in pred:
+                        meeting_node = neighbor
+                        break
+                if meeting_node is not None:
+                    break
+    
+    if meeting_node is None:
+        return None
+    
+    # Walk back to the source, then forward to the target
+    path = []
+    node = meeting_node
+    while node is not None:
+        path.append(node)
+        node = pred[node]
+    path.reverse()
+    node = succ[meeting_node]
+    while node is not None:
+        path.append(node)
+        node = succ[node]
+    return path
+
+
+def _csr_shortest_path(graph, source: int, target: int) -> Optional[List[int]]:
+    """
+    Find a weighted shortest path between two vertices of a CSR distance matrix.
+    
+    Args:
+        graph: Directed CSR matrix of edge distances
+        source: Source vertex index
+        target: Target vertex index
+        
+    Returns:
+        List of vertex indices from source to target, or None if unreachable
+    """
+    dist, predecessors = csgraph.dijkstra(graph, directed=True, indices=source, return_predecessors=True)
+    if np.isinf(dist[target]):
+        return None
+    
+    # Walk the predecessor tree back from the target
+    path = [target]
+    while path[-1] != source:
+        path.append(int(predecessors[path[-1]]))
+    path.reverse()
+    return path
+
+
+def _make_risk_view(risk) -> RiskView:
+    """
+    Normalize a risk into a RiskView, applying attribute defaults once.
+    
+    Args:
+        risk: Risk object from the data store
+        
+    Returns:
+        RiskView with None for missing scalars and empty containers for missing collections
+    """
+    entities = getattr(risk, 'entities', None)
+    events = getattr(risk, 'events', None)
+    related_risks = getattr(risk, 'related_risks', None)
+    attributes = getattr(risk, 'attributes', None)
+    transmissions = (attributes.get("risk_transmissions") or _EMPTY_MAPPING) if isinstance(attributes, dict) else _EMPTY_MAPPING
+    
+    created_day = None
+    created_at = getattr(risk, 'created_at', None)
+    if created_at is not None:
+        try:
+            created_day = _creation_day(created_at)
+        except Exception as date_error:
+            logger.warning(f"Error processing date for risk {getattr(risk, 'id', 'unknown')}: {date_error}")
+    
+    return RiskView(
+        id=getattr(risk, 'id', None),
+        title=getattr(risk, 'title', None),
+        risk_type=getattr(risk, 'risk_type', None),
+        severity=getattr(risk, 'severity', None),
+        likelihood=getattr(risk, 'likelihood', None),
+        entities=entities if isinstance(entities, list) else (),
+        events=events if isinstance(events, list) else (),
+        created_day=created_day,
+        related_risks=related_risks if isinstance(related_risks, list) else (),
+        transmissions=transmissions
+    )
+
+
+def _severity_level(severity) -> Optional[int]:
+    """
+    Normalize a risk severity to a level that fits the int8 severity column.
+    
+    Args:
+        severity: Severity attribute of a risk
+        
+    Returns:
+        The severity, or None if it is missing or not a small non-negative int
+    """
+    if isinstance(severity, int) and 0 <= severity <= 127:
+        return severity
+    return None
+
+
+def _make_risk_arrays(views: List[RiskView]) -> RiskArrays:
+    """
+    Build the column arrays of a RiskView list.
+    
+    Args:
+        views: RiskView tuples
+        
+    Returns:
+        RiskArrays aligned with the views
+    """
+    severity = np.fromiter(
+        (-1 if level is None else level for level in (_severity_level(view.severity) for view in views)),
+        dtype=np.int8, count=len(views)
+    )
+    likelihood = np.fromiter((view.likelihood or 0.0 for view in views), dtype=np.float64, count=len(views))
+    return RiskArrays(severity, likelihood)
+
+
+def _top_risk_indices(severity: np.ndarray, likelihood: np.ndarray, k: int) -> np.ndarray:
+    """
+    Select the k risks with the highest (severity, likelihood), like heapq.nlargest.
+    
+    Ties keep their original order. Likelihoods lie in [0, 1], so twice the
+    severity plus the likelihood orders risks exactly as the tuple key does.
+    
+    Args:
+        severity: Severity array, negative for missing values
+        likelihood: Likelihood array
+        k: Number of risks to select
+        
+    Returns:
+        Indices of the selected risks, highest first
+    """
+    score = 2.0 * np.maximum(severity, 0) + likelihood
+    if k < len(score):
+        # Keep everything at or above the k-th largest score, then break ties by position
+        kth_score = np.partition(score, len(score) - k)[len(score) - k]
+        candidates = np.flatnonzero(score >= kth_score)
+    else:
+        candidates = np.arange(len(score))
+    order = np.lexsort((candidates, -score[candidates]))
+    return candidates[order[:k]]
+
+
+class _UncachedRiskPath(Exception):
+    """Carries a risk path found after a recoverable error, which must not be memoized."""
+    
+    def __init__(self, result: List[Dict[str, Any]]):
+        super().__init__("risk path found after an error")
+        self.result = result
+
+
+def _lowercase_match(match):
+    """
+    Lowercase a findall result, which is a string or a tuple of group strings.
+    
+    Args:
+        match: Single findall result
+        
+    Returns:
+        The match with every string lowercased
+    """
+    if isinstance(match, str):
+        return match.lower()
+    return tuple(group.lower() for group in match)
+
+
+def _score_risk_categories(risk_scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert per-category pattern match counts into severities and likelihoods.
+    
+    Args:
+        risk_scores: Array of match counts, one per risk category
+        
+    Returns:
+        Tuple of (int8 severity, likelihood) arrays aligned with the input
+    """
+    severities = np.clip(risk_scores // 2, 1, 5).astype(np.int8)
+    likelihoods = np.clip(risk_scores / 10.0, 0.1, 0.9)
+    return severities, likelihoods
+
+
+@functools.lru_cache(maxsize=4096)
+def _creation_day(created_at) -> str:
+    """
+    Format a risk creation timestamp as a YYYY-MM-DD day.
+    
+    Args:
+        created_at: Creation datetime or ISO-8601 string
+        
+    Returns:
+        Day string of the creation date
+    """
+    if isinstance(created_at, str):
+        if len(created_at) >= 10 and created_at[4] == '-' and created_at[7] == '-':
+            return created_at[:10]  # ISO-8601 strings already start with the day
+        created_at = datetime.fromisoformat(created_at)
+    # date.isoformat() yields YYYY-MM-DD without going through the strftime format parser
+    return created_at.date().isoformat()
+
+
 class RiskAnalyzer:
     """
     Analyzes financial risks from events and builds risk models.
@@ -25,65 +459,43 @@ class RiskAnalyzer:
         """
         self.data_store = data_store
         
-        # Risk patterns for different risk categories
-        self.risk_patterns = {
-            "Market Risk Event": [
-                r"(market|stock|index|bond)\s+(crash|collapse|volatility|correction)",
-                r"(interest rate|yield|spread)\s+(rise|increase|jump|spike|volatility)",
-                r"(bull|bear)\s+market",
-                r"market\s+uncertainty",
-                r"(valuation|bubble|overvaluation|undervaluation)"
-            ],
-            "Credit Risk Event": [
-                r"(default|bankruptcy|insolvency|restructuring)",
-                r"(debt|loan)\s+(problem|issue|concern)",
-                r"(credit|debt)\s+rating\s+(downgrade|cut|lower)",
-                r"(non-performing|bad)\s+(loan|debt)",
-                r"debt\s+burden"
-            ],
-            "Liquidity Risk Event": [
-                r"(liquidity|cash|funding)\s+(problem|issue|concern|crisis|squeeze)",
-                r"(unable|difficulty)\s+to\s+(raise|secure)\s+(funding|capital|money)",
-                r"(frozen|dry up|seized)\s+(credit|market|funding)",
-                r"(bank|financial)\s+run",
-                r"(withdraw|redemption)\s+surge"
-            ],
-            "Operational Risk Event": [
-                r"(operational|system|technical)\s+(failure|breakdown|outage|disruption)",
-                r"(cyber|security)\s+(attack|breach|incident|threat)",
-                r"(fraud|misconduct|corruption|scandal)",
-                r"(human|employee)\s+error",
-                r"(natural disaster|fire|flood|earthquake|pandemic|supply chain)\s+(disruption|issue)"
-            ],
-            "Legal Risk Event": [
-                r"(lawsuit|litigation|legal action|sue|sued)",
-                r"(fine|penalty|sanction)",
-                r"(regulatory|compliance|legal)\s+(violation|breach|issue|problem)",
-                r"(investigation|probe|inquiry)",
-                r"(settlement|judgment)\s+against"
-            ],
-            "Strategic Risk Event": [
-                r"(strategic|strategy)\s+(failure|mistake|error)",
-                r"(competition|competitor)\s+(pressure|threat)",
-                r"(merger|acquisition|partnership)\s+(failure|problem|issue)",
-                r"(business model|strategy)\s+(change|shift)",
-                r"(enter|exit)\s+(market|business|industry)"
-            ],
-            "Reputation Risk Event": [
-                r"(reputation|reputational)\s+(damage|harm|crisis|issue)",
-                r"(public|customer|consumer)\s+(backlash|criticism|protest)",
-                r"(scandal|controversy)",
-                r"(social media|PR)\s+(crisis|disaster|backlash)",
-                r"(boycott|public relations)\s+issue"
-            ],
-            "Regulatory Risk Event": [
-                r"(regulation|regulatory)\s+(change|reform|tightening|new)",
-                r"(compliance|regulatory)\s+(cost|burden|requirement)",
-                r"(legislation|law|rule)\s+(change|new|proposed)",
-                r"(regulatory|government)\s+(crackdown|enforcement)",
-                r"(license|permit|approval)\s+(revoke|suspend|deny|delay)"
-            ]
-        }
+        # Risk patterns for different risk categories, compiled once per process
+        self.risk_patterns = _compile_risk_patterns()
+        self._category_patterns = _compile_category_patterns()
+        
+        # Flattened (risk_type, pattern) list; position is the Hyperscan pattern id
+        self._pattern_index = [
+            (risk_type, pattern)
+            for risk_type, patterns in self.risk_patterns.items()
+            for pattern in patterns
+        ]
+        self._pattern_db = self._compile_pattern_database()
+        
+        # Risk relationship graph for find_risk_path as a CSR distance matrix,
+        # its risk ID <-> row index mappings and the risk revision it reflects
+        self._risk_csr = None
+        self._risk_id_to_idx = {}
+        self._risk_ids = []
+        self._risk_graph_version = None
+        
+        # Event ID -> event type index and the event revision it reflects
+        self._event_type_index = {}
+        self._event_type_index_version = None
+        
+        # Last calculate_risk_metrics result and the (risks, entities) revisions it reflects
+        self._metrics_cache = None
+        self._metrics_cache_version = None
+        
+        # RiskView snapshots of the stored risks, their column arrays and the risk revision they reflect
+        self._risk_views = []
+        self._risk_arrays = None
+        self._risk_views_version = None
+        
+        # Memoized find_risk_path results, keyed by (source, target, store version)
+        self._find_risk_path_cached = functools.lru_cache(maxsize=1024)(self._find_risk_path_impl)
+        
+        # Memoized risk path steps, keyed by (current risk, next risk, risks revision)
+        self._edge_detail_cached = functools.lru_cache(maxsize=4096)(self._edge_detail)
         
         # Risk propagation rules from FEEKG framework
         self.risk_propagation_rules = {
@@ -254,29 +666,62 @@ class RiskAnalyzer:
             return risk_ids
         
         # Combine news content for risk assessment
-        combined_text = f"{event.title} {event.description} "
+        text_parts = [event.title, event.description]
         for news in news_items:
-            combined_text += f"{news.title} {news.content} "
+            text_parts.append(news.title)
+            text_parts.append(news.content)
+        combined_text = " ".join(map(str, text_parts)) + " "
         
-        combined_text = combined_text.lower()
+        # Only patterns that occur in the text need a regex pass. Patterns are
+        # case-insensitive, so the text is never lowercased as a whole
+        candidate_patterns = self._candidate_patterns(combined_text)
+        if candidate_patterns is None:
+            candidate_patterns = self._candidate_categories(combined_text)
+        if not candidate_patterns:
+            return risk_ids
         
-        # Check for risk patterns in each category
-        for risk_type, patterns in self.risk_patterns.items():
+        # Count risk pattern matches in each category without building match groups
+        risk_types = list(self.risk_patterns)
+        risk_scores = np.zeros(len(risk_types), dtype=np.int32)
+        for position, risk_type in enumerate(risk_types):
             risk_score = 0
-            pattern_matches = []
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, combined_text)
-                risk_score += len(matches)
-                if matches:
-                    pattern_matches.extend(matches)
-            
+            for pattern in candidate_patterns.get(risk_type, ()):
+                # Severity and likelihood cannot grow past the saturating score
+                remaining = _SATURATING_RISK_SCORE - risk_score
+                risk_score += sum(1 for _ in itertools.islice(pattern.finditer(combined_text), remaining))
+                if risk_score >= _SATURATING_RISK_SCORE:
+                    break
+            risk_scores[position] = risk_score
+        
+        # Collect the matched text only for categories that cross the threshold
+        category_matches = []
+        for risk_type, risk_score in zip(risk_types, risk_scores.tolist()):
+            # Distinct matches only; the description lists each indicator once
+            pattern_matches = set()
+            if risk_score >= 2:
+                match_count = 0
+                for pattern in candidate_patterns.get(risk_type, ()):
+                    matches = pattern.findall(combined_text)
+                    pattern_matches.update(_lowercase_match(match) for match in matches)
+                    match_count += len(matches)
+                    if match_count >= _SATURATING_RISK_SCORE:
+                        break
+            category_matches.append(pattern_matches)
+        
+        # Calculate risk severity and likelihood for all categories at once
+        severities, likelihoods = _score_risk_categories(risk_scores)
+        
+        # Resolve the event's entities once for all risk types
+        event_entities = []
+        for entity_id in event.entities:
+            entity = self.data_store.get_entity(entity_id)
+            if entity:
+                event_entities.append((entity_id, entity))
+        
+        for risk_type, pattern_matches, risk_score, severity, likelihood in zip(
+                risk_types, category_matches, risk_scores.tolist(), severities.tolist(), likelihoods.tolist()):
             # If risk score reaches threshold, create a risk
             if risk_score >= 2:
-                # Calculate risk severity and likelihood based on pattern matches
-                severity = min(5, max(1, int(risk_score / 2)))
-                likelihood = min(0.9, max(0.1, risk_score / 10.0))
-                
                 # Create risk title and description
                 risk_title = self._generate_risk_title(event, risk_type)
                 risk_description = self._generate_risk_description(event, risk_type, pattern_matches)
@@ -295,12 +740,10 @@ class RiskAnalyzer:
                 risk.add_event(event.id, 1.0)
                 
                 # Add affected entities
-                for entity_id in event.entities:
-                    entity = self.data_store.get_entity(entity_id)
-                    if entity:
-                        # Determine impact level based on entity type and risk type
-                        impact_level = self._calculate_entity_impact_level(entity, risk_type)
-                        risk.add_entity(entity_id, impact_level)
+                for entity_id, entity in event_entities:
+                    # Determine impact level based on entity type and risk type
+                    impact_level = self._calculate_entity_impact_level(entity, risk_type)
+                    risk.add_entity(entity_id, impact_level)
                 
                 # Add impact areas
                 risk.impact_areas = self._determine_impact_areas(risk_type)
@@ -311,6 +754,77 @@ class RiskAnalyzer:
         
         return risk_ids
     
+    def _compile_pattern_database(self):
+        """
+        Compile all risk patterns into a single Hyperscan block database.
+        
+        Returns:
+            Hyperscan database, or None if Hyperscan is unavailable or compilation fails
+        """
+        if not HYPERSCAN_AVAILABLE:
+            return None
+        
+        try:
+            flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH |
+                     hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP)
+            database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            database.compile(
+                expressions=[pattern.pattern.encode("utf-8") for _, pattern in self._pattern_index],
+                ids=list(range(len(self._pattern_index))),
+                flags=[flags] * len(self._pattern_index)
+            )
+            return database
+        except Exception as e:
+            logger.error(f"Error compiling Hyperscan pattern database: {e}")
+            return None
+    
+    def _candidate_patterns(self, text: str) -> Optional[Dict[str, List[Any]]]:
+        """
+        Find the risk patterns that may occur in a text with a single Hyperscan scan.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            Dictionary mapping risk types to their candidate compiled patterns, in
+            pattern order, or None if Hyperscan is unavailable
+        """
+        if self._pattern_db is None:
+            return None
+        
+        matched_ids = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            matched_ids.add(pattern_id)
+        
+        try:
+            self._pattern_db.scan(text.encode("utf-8"), match_event_handler=on_match)
+        except Exception as e:
+            logger.error(f"Error scanning text with Hyperscan: {e}")
+            return None
+        
+        candidates = {}
+        for pattern_id in sorted(matched_ids):
+            risk_type, pattern = self._pattern_index[pattern_id]
+            candidates.setdefault(risk_type, []).append(pattern)
+        return candidates
+    
+    def _candidate_categories(self, text: str) -> Dict[str, List[Any]]:
+        """
+        Keep only the risk categories with at least one pattern in a text.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            Dictionary mapping matching risk types to all of their compiled patterns
+        """
+        return {
+            risk_type: patterns
+            for risk_type, patterns in self.risk_patterns.items()
+            if self._category_patterns[risk_type].search(text)
+        }
+    
     def _generate_risk_title(self, event, risk_type: str) -> str:
         """
         Generate a descriptive title for a risk.
@@ -340,14 +854,14 @@ class RiskAnalyzer:
         
         return f"{risk_category} for {entity_text} from {event.event_type.replace('_', ' ').title()} Event"
     
-    def _generate_risk_description(self, event, risk_type: str, pattern_matches: List) -> str:
+    def _generate_risk_description(self, event, risk_type: str, pattern_matches: Set) -> str:
         """
         Generate a descriptive text for a risk.
         
         Args:
             event: Triggering event
             risk_type: Risk category
-            pattern_matches: Risk pattern matches from text
+            pattern_matches: Distinct risk pattern matches from text
             
         Returns:
             Risk description
@@ -360,24 +874,13 @@ class RiskAnalyzer:
         
         # Add specific risk indicators found
         if pattern_matches:
-            indicators = ", ".join(set(str(match) for match in pattern_matches if match))
+            indicators = ", ".join(str(match) for match in pattern_matches if match)
             indicators_desc = f"Risk indicators found: {indicators}. "
         else:
             indicators_desc = ""
         
         # Add general risk description based on type
-        risk_explanations = {
-            "Market Risk Event": "Market risk involves potential losses due to market movements and volatility.",
-            "Credit Risk Event": "Credit risk involves potential losses due to counterparty default or credit deterioration.",
-            "Liquidity Risk Event": "Liquidity risk involves potential losses or operational issues due to inability to meet cash flow needs.",
-            "Operational Risk Event": "Operational risk involves potential losses due to failed internal processes, people, systems, or external events.",
-            "Legal Risk Event": "Legal risk involves potential losses due to legal actions, regulatory violations, or contractual issues.",
-            "Strategic Risk Event": "Strategic risk involves potential losses due to failed business decisions or implementation.",
-            "Reputation Risk Event": "Reputation risk involves potential losses due to damage to company image or brand.",
-            "Regulatory Risk Event": "Regulatory risk involves potential losses due to regulatory changes or compliance failures."
-        }
-        
-        type_desc = risk_explanations.get(risk_type, "")
+        type_desc = _RISK_EXPLANATIONS.get(risk_type, "")
         
         # Combine parts
         return f"{base_desc}{event_desc}{indicators_desc}{type_desc}"
@@ -422,19 +925,8 @@ class RiskAnalyzer:
         Returns:
             List of impact areas
         """
-        # Map risk types to impact areas
-        impact_areas_map = {
-            "Market Risk Event": ["Financial Markets", "Investment Performance", "Asset Valuations"],
-            "Credit Risk Event": ["Debt Servicing", "Counterparty Exposure", "Credit Ratings"],
-            "Liquidity Risk Event": ["Cash Flow", "Funding Access", "Asset Liquidity"],
-            "Operational Risk Event": ["Business Operations", "Systems & Technology", "People & Process"],
-            "Legal Risk Event": ["Legal Liability", "Compliance", "Corporate Governance"],
-            "Strategic Risk Event": ["Business Strategy", "Competitive Position", "Business Model"],
-            "Reputation Risk Event": ["Brand Value", "Customer Trust", "Public Perception"],
-            "Regulatory Risk Event": ["Regulatory Compliance", "Policy Environment", "Licensing"]
-        }
-        
-        return impact_areas_map.get(risk_type, ["Financial", "Operational"])
+        # Copy so callers can modify the risk's list without touching the shared table
+        return list(_IMPACT_AREAS.get(risk_type, _DEFAULT_IMPACT_AREAS))
     
     def _model_risk_transmission(self) -> None:
         """
@@ -447,26 +939,129 @@ class RiskAnalyzer:
         if len(risks) < 2:
             return
         
-        # Build a graph of entity relationships
-        entity_graph = nx.Graph()
+        # Intern entity IDs as contiguous ints, risk entities first and then the
+        # remaining relationship endpoints, so string keys are hashed only here
+        entity_index = {}
+        risk_entity_ids = [
+            [entity_index.setdefault(entity_id, len(entity_index)) for entity_id in risk.entities]
+            for risk in risks
+        ]
+        risk_entity_count = len(entity_index)
         
-        # Add all entity relationships to graph
         relationships = self.data_store.get_all_relationships()
-        for rel in relationships:
-            entity_graph.add_edge(rel.source_id, rel.target_id, weight=rel.confidence)
+        edge_sources = [entity_index.setdefault(rel.source_id, len(entity_index)) for rel in relationships]
+        edge_targets = [entity_index.setdefault(rel.target_id, len(entity_index)) for rel in relationships]
+        
+        # Binary risk x entity matrix; M @ M.T counts the entities each risk pair shares
+        rows = [index for index, entity_ids in enumerate(risk_entity_ids) for _ in entity_ids]
+        columns = [entity_id for entity_ids in risk_entity_ids for entity_id in entity_ids]
+        incidence = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+            shape=(len(risks), risk_entity_count)
+        )
+        incidence.data[:] = 1  # Repeated entity IDs count once
+        shared = sp.triu(incidence @ incidence.T, k=1).tocsr()
+        shared_coo = shared.tocoo()
+        
+        # Struct-of-arrays view of the risks for the pairwise math
+        risk_ids = np.array([risk.id for risk in risks], dtype=object)
+        type_ids = np.array([_RISK_TYPE_ID.get(risk.risk_type, len(_RISK_TYPE_ID)) for risk in risks], dtype=np.int8)
+        risk_levels = _HIERARCHY_LEVELS[type_ids]
+        
+        # Entity relationship graph as a CSR adjacency over the interned IDs
+        adjacency = sp.csr_matrix(
+            (np.ones(len(edge_sources)), (edge_sources, edge_targets)),
+            shape=(len(entity_index), len(entity_index))
+        )
+        adjacency.data[:] = 1  # Repeated relationships are a single edge
+        
+        # Risk entities that take part in at least one relationship
+        in_graph = np.zeros(len(entity_index), dtype=bool)
+        in_graph[edge_sources] = True
+        in_graph[edge_targets] = True
+        graph_entities = np.flatnonzero(in_graph[:risk_entity_count])
+        graph_rows = np.full(risk_entity_count, -1, dtype=np.intp)
+        graph_rows[graph_entities] = np.arange(len(graph_entities))
+        
+        # Hop distances between all risk entities in the entity graph, in one
+        # C-level BFS batch over the CSR adjacency
+        if len(graph_entities):
+            positions = graph_entities.tolist()
+            hops = _hop_distances(adjacency, positions, positions)
+            
+            # Connected component of each risk entity; entities reach each other
+            # exactly when they share a component
+            component_count, component_labels = csgraph.connected_components(adjacency, directed=False)
+            entity_components = component_labels[graph_entities]
+        else:
+            hops = np.empty((0, 0))
+        
+        # Per-risk data computed once instead of per pair: entity counts and the
+        # risk's entities that appear in the entity graph, with their hop matrix rows
+        entity_counts = np.array([len(risk.entities) for risk in risks], dtype=np.int64)
+        risk_graph_entities = []
+        risk_graph_rows = []
+        for risk, entity_ids in zip(risks, risk_entity_ids):
+            entity_rows = graph_rows[entity_ids] if entity_ids else graph_rows[:0]
+            mask = entity_rows >= 0
+            risk_graph_entities.append([entity_id for entity_id, keep in zip(risk.entities, mask.tolist()) if keep])
+            risk_graph_rows.append(entity_rows[mask])
+        
+        # Neighbor lists for rebuilding the stored entity paths, built on first use
+        entity_neighbors = None
+        
+        # Paths between entity pairs, computed on first use
+        entity_paths = {}
+        
+        # Candidate pairs share an entity or have entities in a common component:
+        # (risk x entity) @ (entity x component), multiplied by its transpose
+        candidate_pairs = set(zip(shared_coo.row.tolist(), shared_coo.col.tolist()))
+        if len(graph_entities):
+            graph_incidence = incidence[:, graph_entities]
+            membership = sp.csr_matrix(
+                (np.ones(len(graph_entities), dtype=np.int32), (np.arange(len(graph_entities)), entity_components)),
+                shape=(len(graph_entities), component_count)
+            )
+            risk_components = graph_incidence @ membership
+            connected = sp.triu(risk_components @ risk_components.T, k=1).tocoo()
+            candidate_pairs.update(zip(connected.row.tolist(), connected.col.tolist()))
+        
+        # Risks changed by the pair loop, saved in one batch at the end
+        modified_risks = {}
+        
+        if not candidate_pairs:
+            return
+        
+        # Pair arrays in the same order as itertools.combinations(risks, 2)
+        pairs = np.array(sorted(candidate_pairs), dtype=np.intp).reshape(-1, 2)
+        first, second = pairs[:, 0], pairs[:, 1]
         
-        # For each pair of risks, check if they are connected through entities
-        for risk1, risk2 in itertools.combinations(risks, 2):
+        # Shared-entity correlations and hierarchy directions for all pairs at once
+        common_counts = np.asarray(shared[first, second]).ravel()
+        min_counts = np.minimum(entity_counts[first], entity_counts[second])
+        correlations = np.divide(common_counts, min_counts, out=np.zeros(len(pairs)), where=min_counts > 0)
+        directions = np.sign(risk_levels[first].astype(np.int64) - risk_levels[second])
+        distinct = risk_ids[first] != risk_ids[second]
+        
+        # Lower numbers typically affect higher numbers in the hierarchy
+        direction_types = {
+            -1: ("may_cause", "may_be_caused_by"),  # Risk1 likely affects Risk2
+            1: ("may_be_caused_by", "may_cause"),  # Risk2 likely affects Risk1
+            0: ("may_influence", "may_influence")  # Same level, bidirectional influence
+        }
+        
+        # Apply the results to the risk objects
+        for index1, index2, common_count, correlation, direction, is_distinct in zip(
+                first.tolist(), second.tolist(), common_counts.tolist(), correlations.tolist(),
+                directions.tolist(), distinct.tolist()):
+            risk1, risk2 = risks[index1], risks[index2]
+            
             # Skip if risks are the same
-            if risk1.id == risk2.id:
+            if not is_distinct:
                 continue
             
             # Check if risks share entities
-            common_entities = set(risk1.entities).intersection(set(risk2.entities))
-            if common_entities:
-                # Risks share entities directly
-                correlation = len(common_entities) / min(len(risk1.entities), len(risk2.entities))
-                
+            if common_count:
                 # Create bi-directional risk relationships
                 relationship_type = "correlated_with"
                 
@@ -477,24 +1072,30 @@ class RiskAnalyzer:
                 risk1.attributes.setdefault("risk_correlations", {})[risk2.id] = correlation
                 risk2.attributes.setdefault("risk_correlations", {})[risk1.id] = correlation
                 
-                # Save risks
-                self.data_store.save_risk(risk1)
-                self.data_store.save_risk(risk2)
+                # Mark risks for saving
+                modified_risks[risk1.id] = risk1
+                modified_risks[risk2.id] = risk2
             
             else:
-                # Check if risks are connected through entity relationships
-                all_paths = []
+                # Closest entity pair; argmin returns the first minimum in
+                # row-major order, so ties go to the earliest (entity1, entity2)
+                closest_pair = None
+                rows1, rows2 = risk_graph_rows[index1], risk_graph_rows[index2]
+                if len(rows1) and len(rows2):
+                    distances = hops[np.ix_(rows1, rows2)]
+                    closest = int(np.argmin(distances))
+                    position1, position2 = divmod(closest, len(rows2))
+                    if np.isfinite(distances[position1, position2]):
+                        closest_pair = (risk_graph_entities[index1][position1], risk_graph_entities[index2][position2])
                 
-                for entity1 in risk1.entities:
-                    for entity2 in risk2.entities:
-                        if entity_graph.has_node(entity1) and entity_graph.has_node(entity2):
-                            try:
-                                # Find the shortest path between entities
-                                if nx.has_path(entity_graph, entity1, entity2):
-                                    path = nx.shortest_path(entity_graph, entity1, entity2)
-                                    all_paths.append(path)
-                            except:
-                                continue
+                all_paths = []
+                if closest_pair:
+                    # Risks sharing entities often resolve to the same entity pair
+                    if closest_pair not in entity_paths:
+                        if entity_neighbors is None:
+                            entity_neighbors = self._build_entity_adjacency(relationships)
+                        entity_paths[closest_pair] = _bidirectional_bfs_path(entity_neighbors, *closest_pair)
+                    all_paths.append(list(entity_paths[closest_pair]))
                 
                 if all_paths:
                     # Risks are connected through entity relationships
@@ -504,34 +1105,10 @@ class RiskAnalyzer:
                     # Calculate transmission strength based on path length
                     transmission_strength = 1.0 / path_length if path_length > 0 else 0.5
                     
-                    # Determine direction based on risk types
-                    risk_hierarchy = {
-                        "Market Risk Event": 1,
-                        "Credit Risk Event": 2,
-                        "Liquidity Risk Event": 3,
-                        "Operational Risk Event": 4,
-                        "Legal Risk Event": 5,
-                        "Strategic Risk Event": 6,
-                        "Reputation Risk Event": 7,
-                        "Regulatory Risk Event": 8
-                    }
-                    
-                    # Lower numbers typically affect higher numbers in the hierarchy
-                    risk1_level = risk_hierarchy.get(risk1.risk_type, 0)
-                    risk2_level = risk_hierarchy.get(risk2.risk_type, 0)
-                    
-                    if risk1_level < risk2_level:
-                        # Risk1 likely affects Risk2
-                        risk1.add_related_risk(risk2.id, "may_cause")
-                        risk2.add_related_risk(risk1.id, "may_be_caused_by")
-                    elif risk1_level > risk2_level:
-                        # Risk2 likely affects Risk1
-                        risk1.add_related_risk(risk2.id, "may_be_caused_by")
-                        risk2.add_related_risk(risk1.id, "may_cause")
-                    else:
-                        # Same level, bidirectional influence
-                        risk1.add_related_risk(risk2.id, "may_influence")
-                        risk2.add_related_risk(risk1.id, "may_influence")
+                    # Direction based on risk types
+                    forward_type, backward_type = direction_types[direction]
+                    risk1.add_related_risk(risk2.id, forward_type)
+                    risk2.add_related_risk(risk1.id, backward_type)
                     
                     # Store transmission strength
                     risk1.attributes.setdefault("risk_transmissions", {})[risk2.id] = transmission_strength
@@ -541,9 +1118,31 @@ class RiskAnalyzer:
                     risk1.attributes.setdefault("transmission_paths", {})[risk2.id] = shortest_path
                     risk2.attributes.setdefault("transmission_paths", {})[risk1.id] = shortest_path
                     
-                    # Save risks
-                    self.data_store.save_risk(risk1)
-                    self.data_store.save_risk(risk2)
+                    # Mark risks for saving
+                    modified_risks[risk1.id] = risk1
+                    modified_risks[risk2.id] = risk2
+        
+        # Save all modified risks with a single write
+        self.data_store.save_risks(list(modified_risks.values()))
+    
+    def _build_entity_adjacency(self, relationships: List[Any]) -> Dict[str, List[str]]:
+        """
+        Build undirected neighbor lists of the entity relationship graph.
+        
+        Neighbors are kept in first-seen order, the same order an nx.Graph built
+        with add_edge would iterate them.
+        
+        Args:
+            relationships: Relationship objects
+            
+        Returns:
+            Dictionary mapping entity IDs to their neighbor IDs
+        """
+        neighbors = {}
+        for rel in relationships:
+            neighbors.setdefault(rel.source_id, {})[rel.target_id] = None
+            neighbors.setdefault(rel.target_id, {})[rel.source_id] = None
+        return {entity_id: list(adjacent) for entity_id, adjacent in neighbors.items()}
     
     def find_risk_transmission_paths(self) -> List[Dict[str, Any]]:
         """
@@ -562,12 +1161,17 @@ class RiskAnalyzer:
                 logger.info("No risks found for transmission path analysis")
                 return []
             
+            # Entity lookups shared by all paths
+            path_entities = {}
+            
             # Extract transmission paths
             for risk in risks:
                 if not hasattr(risk, 'attributes') or not isinstance(risk.attributes, dict):
                     continue
                     
                 if "transmission_paths" in risk.attributes:
+                    transmissions = risk.attributes.get("risk_transmissions") or _EMPTY_MAPPING
+                    relationships = risk.attributes.get("risk_relationships") or _EMPTY_MAPPING
                     for target_id, path in risk.attributes["transmission_paths"].items():
                         target_risk = self.data_store.get_risk(target_id)
                         if target_risk:
@@ -579,15 +1183,17 @@ class RiskAnalyzer:
                                 # Get entity names along the path
                                 entity_names = []
                                 for entity_id in path:
-                                    entity = self.data_store.get_entity(entity_id)
+                                    if entity_id not in path_entities:
+                                        path_entities[entity_id] = self.data_store.get_entity(entity_id)
+                                    entity = path_entities[entity_id]
                                     if entity:
                                         entity_names.append(entity.name)
                                 
                                 # Get transmission strength if available
-                                strength = risk.attributes.get("risk_transmissions", {}).get(target_id, 0.5)
+                                strength = transmissions.get(target_id, 0.5)
                                 
                                 # Get relationship type
-                                relationship = risk.attributes.get("risk_relationships", {}).get(target_id, "connected_to")
+                                relationship = relationships.get(target_id, "connected_to")
                                 
                                 # Add path information
                                 transmission_paths.append({
@@ -623,121 +1229,251 @@ class RiskAnalyzer:
         Returns:
             List with the specific risk path
         """
+        # Results are cached per revision of the stored risks and entities
+        store_version = (self.data_store.revisions["risks"], self.data_store.revisions["entities"])
         try:
-            # Get the risks
-            source_risk = self.data_store.get_risk(source_id)
-            target_risk = self.data_store.get_risk(target_id)
-            
-            if not source_risk or not target_risk:
-                logger.warning(f"Source risk {source_id} or target risk {target_id} not found")
-                return []
-            
-            # Check if there is a direct transmission path
-            if hasattr(source_risk, 'attributes') and isinstance(source_risk.attributes, dict) and \
-               "transmission_paths" in source_risk.attributes and \
-               target_id in source_risk.attributes["transmission_paths"]:
-                try:
-                    path = source_risk.attributes["transmission_paths"][target_id]
-                    
-                    # Get entity names along the path
-                    entity_names = []
-                    for entity_id in path:
-                        entity = self.data_store.get_entity(entity_id)
-                        if entity and hasattr(entity, 'name'):
-                            entity_names.append(entity.name)
-                    
-                    # Get transmission strength if available
-                    strength = source_risk.attributes.get("risk_transmissions", {}).get(target_id, 0.5)
-                    
-                    # Get relationship type
-                    relationship = source_risk.attributes.get("risk_relationships", {}).get(target_id, "connected_to")
-                    
-                    return [{
-                        "source_id": source_risk.id,
-                        "source_title": source_risk.title,
-                        "source_type": source_risk.risk_type,
-                        "target_id": target_id,
-                        "target_title": target_risk.title,
-                        "target_type": target_risk.risk_type,
-                        "path": entity_names,
-                        "strength": strength,
-                        "relationship": relationship
-                    }]
-                except Exception as direct_path_error:
-                    logger.warning(f"Error processing direct risk path: {direct_path_error}")
-            
-            # If no direct path, try to find an indirect path through other risks
-            risk_graph = nx.DiGraph()
-            
-            # Build a graph of risk relationships
-            try:
-                risks = self.data_store.get_all_risks()
-                if not risks:
-                    return []
-                    
-                for risk in risks:
-                    if not hasattr(risk, 'related_risks') or not isinstance(risk.related_risks, list) or not hasattr(risk, 'id'):
-                        continue
-                        
-                    for related_id in risk.related_risks:
-                        # Use transmission strength as weight if available
-                        weight = 1.0
-                        if hasattr(risk, 'attributes') and isinstance(risk.attributes, dict) and \
-                           "risk_transmissions" in risk.attributes and \
-                           related_id in risk.attributes["risk_transmissions"]:
-                            weight = 1.0 - risk.attributes["risk_transmissions"][related_id]  # Convert to distance
-                        
-                        risk_graph.add_edge(risk.id, related_id, weight=weight)
-                
-                # Try to find a path in the risk graph
-                if risk_graph.has_node(source_id) and risk_graph.has_node(target_id):
-                    try:
-                        if nx.has_path(risk_graph, source_id, target_id):
-                            # Find the shortest path
-                            path = nx.shortest_path(risk_graph, source_id, target_id, weight='weight')
-                            
-                            # Build a more detailed path description
-                            detailed_path = []
-                            for i in range(len(path) - 1):
-                                current_id = path[i]
-                                next_id = path[i+1]
-                                
-                                current_risk = self.data_store.get_risk(current_id)
-                                next_risk = self.data_store.get_risk(next_id)
-                                
-                                if current_risk and next_risk and hasattr(current_risk, 'attributes') and \
-                                   isinstance(current_risk.attributes, dict) and hasattr(current_risk, 'title') and \
-                                   hasattr(current_risk, 'risk_type') and hasattr(next_risk, 'title') and \
-                                   hasattr(next_risk, 'risk_type'):
-                                    # Get relationship information
-                                    relationship = current_risk.attributes.get("risk_relationships", {}).get(next_id, "connected_to")
-                                    
-                                    # Get strength information
-                                    strength = current_risk.attributes.get("risk_transmissions", {}).get(next_id, 0.5)
-                                    
-                                    detailed_path.append({
-                                        "source_id": current_id,
-                                        "source_title": current_risk.title,
-                                        "source_type": current_risk.risk_type,
-                                        "target_id": next_id,
-                                        "target_title": next_risk.title,
-                                        "target_type": next_risk.risk_type,
-                                        "relationship": relationship,
-                                        "strength": strength
-                                    })
-                            
-                            return detailed_path
-                    except Exception as path_error:
-                        logger.warning(f"Error finding path in risk graph: {path_error}")
-            except Exception as graph_error:
-                logger.warning(f"Error building risk graph: {graph_error}")
-                
+            path = self._find_risk_path_cached(source_id, target_id, store_version)
+        except _UncachedRiskPath as fallback:
+            path = fallback.result
         except Exception as e:
             logger.error(f"Error finding risk path: {e}")
             import traceback
             traceback.print_exc()
+            return []
+        
+        # Copy so callers cannot modify the memoized result
+        return copy.deepcopy(path)
+    
+    def _find_risk_path_impl(self, source_id: str, target_id: str,
+                             store_version: Tuple[int, int]) -> List[Dict[str, Any]]:
+        """
+        Find and format the transmission path between two risks.
+        
+        Errors propagate so that they are not memoized; a result reached after
+        a recoverable error is raised as _UncachedRiskPath for the same reason.
+        
+        Args:
+            source_id: Source risk ID
+            target_id: Target risk ID
+            store_version: Data store revisions the result is cached under
+            
+        Returns:
+            List with the specific risk path
+        """
+        # Get the risks
+        source_risk = self.data_store.get_risk(source_id)
+        target_risk = self.data_store.get_risk(target_id)
+        
+        if not source_risk or not target_risk:
+            logger.warning(f"Source risk {source_id} or target risk {target_id} not found")
+            return []
+        
+        # Check if there is a direct transmission path
+        direct_path_failed = False
+        try:
+            direct_path = self._direct_risk_path(source_risk, target_risk, target_id)
+            if direct_path is not None:
+                return direct_path
+        except Exception as direct_path_error:
+            logger.warning(f"Error processing direct risk path: {direct_path_error}")
+            direct_path_failed = True
+        
+        # If no direct path, try to find an indirect path through other risks
+        indirect_path = self._indirect_risk_path(source_id, target_id)
+        if direct_path_failed:
+            raise _UncachedRiskPath(indirect_path)
+        return indirect_path
+    
+    def _direct_risk_path(self, source_risk, target_risk, target_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Format the stored direct transmission path between two risks.
+        
+        Args:
+            source_risk: Source risk object
+            target_risk: Target risk object
+            target_id: Target risk ID
+            
+        Returns:
+            List with the direct risk path, or None if none is stored
+        """
+        if not (hasattr(source_risk, 'attributes') and isinstance(source_risk.attributes, dict) and
+                "transmission_paths" in source_risk.attributes and
+                target_id in source_risk.attributes["transmission_paths"]):
+            return None
+        
+        path = source_risk.attributes["transmission_paths"][target_id]
+        
+        # Get entity names along the path
+        entity_names = []
+        for entity_id in path:
+            entity = self.data_store.get_entity(entity_id)
+            if entity and hasattr(entity, 'name'):
+                entity_names.append(entity.name)
+        
+        # Get transmission strength if available
+        strength = (source_risk.attributes.get("risk_transmissions") or _EMPTY_MAPPING).get(target_id, 0.5)
+        
+        # Get relationship type
+        relationship = (source_risk.attributes.get("risk_relationships") or _EMPTY_MAPPING).get(
+            target_id, "connected_to"
+        )
+        
+        return [{
+            "source_id": source_risk.id,
+            "source_title": source_risk.title,
+            "source_type": source_risk.risk_type,
+            "target_id": target_id,
+            "target_title": target_risk.title,
+            "target_type": target_risk.risk_type,
+            "path": entity_names,
+            "strength": strength,
+            "relationship": relationship
+        }]
+    
+    def _indirect_risk_path(self, source_id: str, target_id: str) -> List[Dict[str, Any]]:
+        """
+        Find the shortest path between two risks in the risk relationship graph.
+        
+        Args:
+            source_id: Source risk ID
+            target_id: Target risk ID
+            
+        Returns:
+            List of path steps, empty if the risks are not connected
+        """
+        self._update_risk_graph()
+        
+        # Try to find a path in the risk graph
+        if source_id not in self._risk_id_to_idx or target_id not in self._risk_id_to_idx:
+            return []
+        
+        path = _csr_shortest_path(self._risk_csr, self._risk_id_to_idx[source_id], self._risk_id_to_idx[target_id])
+        if path is None:
+            return []
+        path = [self._risk_ids[idx] for idx in path]
+        
+        # Build a more detailed path description, one cached step per edge
+        risk_version = self.data_store.revisions["risks"]
+        detailed_path = []
+        for current_id, next_id in zip(path, path[1:]):
+            step = self._edge_detail_cached(current_id, next_id, risk_version)
+            if step is not None:
+                detailed_path.append(dict(step))
+        
+        return detailed_path
+    
+    def _edge_detail(self, current_id: str, next_id: str, risk_version: int) -> Optional[MappingProxyType]:
+        """
+        Describe one step of a risk path.
         
-        return []
+        Args:
+            current_id: Risk ID the step starts from
+            next_id: Risk ID the step leads to
+            risk_version: Risks revision the result is cached under
+            
+        Returns:
+            Read-only step mapping, or None if either risk is missing or incomplete
+        """
+        current_risk = self.data_store.get_risk(current_id)
+        next_risk = self.data_store.get_risk(next_id)
+        
+        if not (current_risk and next_risk and hasattr(current_risk, 'attributes') and
+                isinstance(current_risk.attributes, dict) and hasattr(current_risk, 'title') and
+                hasattr(current_risk, 'risk_type') and hasattr(next_risk, 'title') and
+                hasattr(next_risk, 'risk_type')):
+            return None
+        
+        # Get relationship information
+        relationship = (current_risk.attributes.get("risk_relationships") or _EMPTY_MAPPING).get(next_id, "connected_to")
+        
+        # Get strength information
+        strength = (current_risk.attributes.get("risk_transmissions") or _EMPTY_MAPPING).get(next_id, 0.5)
+        
+        # Read-only, since the memoized step is shared by every path through this edge
+        return MappingProxyType({
+            "source_id": current_id,
+            "source_title": current_risk.title,
+            "source_type": current_risk.risk_type,
+            "target_id": next_id,
+            "target_title": next_risk.title,
+            "target_type": next_risk.risk_type,
+            "relationship": relationship,
+            "strength": strength
+        })
+    
+    def _update_risk_graph(self) -> None:
+        """
+        Rebuild the CSR matrix of risk relationships when risks change.
+        
+        Entries are distances derived from transmission strengths; a full-strength
+        transmission is stored as an explicit zero, which csgraph treats as an edge.
+        """
+        risk_version = self.data_store.revisions["risks"]
+        if self._risk_csr is not None and self._risk_graph_version == risk_version:
+            return
+        
+        id_to_idx = {}
+        rows, cols, weights = [], [], []
+        for view in self._get_risk_views():
+            if view.id is None or not view.related_risks:
+                continue
+            
+            source_idx = id_to_idx.setdefault(view.id, len(id_to_idx))
+            for related_id in view.related_risks:
+                rows.append(source_idx)
+                cols.append(id_to_idx.setdefault(related_id, len(id_to_idx)))
+                # Use transmission strength as weight if available, converted to distance
+                weights.append(1.0 - view.transmissions.get(related_id, 0.0))
+        
+        n = len(id_to_idx)
+        self._risk_csr = sp.csr_matrix(
+            (np.asarray(weights, dtype=np.float64), (np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32))),
+            shape=(n, n)
+        )
+        self._risk_id_to_idx = id_to_idx
+        self._risk_ids = list(id_to_idx)
+        self._risk_graph_version = risk_version
+    
+    def _get_risk_views(self) -> List[RiskView]:
+        """
+        Get RiskView snapshots of all stored risks, rebuilding them when risks change.
+        
+        Returns:
+            List of RiskView tuples in data store order
+        """
+        risk_version = self.data_store.revisions["risks"]
+        if self._risk_views_version != risk_version:
+            self._risk_views = [_make_risk_view(risk) for risk in self.data_store.get_all_risks()]
+            self._risk_arrays = _make_risk_arrays(self._risk_views)
+            self._risk_views_version = risk_version
+        return self._risk_views
+    
+    def _get_event_type_index(self) -> Dict[str, Any]:
+        """
+        Get the event ID -> event type index, rebuilding it when events change.
+        
+        Returns:
+            Dictionary mapping IDs of events that have a type to that type
+        """
+        event_version = self.data_store.revisions["events"]
+        if self._event_type_index_version != event_version:
+            self._event_type_index = {
+                event.id: event.event_type
+                for event in self.data_store.get_all_events()
+                if hasattr(event, 'id') and hasattr(event, 'event_type')
+            }
+            self._event_type_index_version = event_version
+        return self._event_type_index
+    
+    def _get_risk_arrays(self) -> RiskArrays:
+        """
+        Get the column arrays of the RiskView snapshots, rebuilding them when risks change.
+        
+        Returns:
+            RiskArrays aligned with _get_risk_views()
+        """
+        self._get_risk_views()
+        return self._risk_arrays
     
     def calculate_risk_metrics(self) -> Dict[str, Any]:
         """
@@ -754,9 +1490,13 @@ class RiskAnalyzer:
         }
         
         try:
-            # Get all risks and events
-            risks = self.data_store.get_all_risks()
-            events = self.data_store.get_all_events()
+            # Metrics depend only on the stored risks and the entities they name
+            store_version = (self.data_store.revisions["risks"], self.data_store.revisions["entities"])
+            if self._metrics_cache is not None and self._metrics_cache_version == store_version:
+                return self._metrics_cache
+            
+            # Get all risks
+            risks = self._get_risk_views()
             
             if not risks:
                 logger.info("No risks found for risk metrics calculation")
@@ -775,43 +1515,77 @@ class RiskAnalyzer:
             # Total risks
             metrics["total_risks"] = len(risks)
             
-            # Risk type distribution
+            arrays = self._get_risk_arrays()
+            
+            # Single pass over risks for the type, severity, entity, correlation and time metrics
             type_counts = {}
-            for risk in risks:
-                if not hasattr(risk, 'risk_type'):
-                    continue
-                    
-                if risk.risk_type not in type_counts:
-                    type_counts[risk.risk_type] = 0
-                type_counts[risk.risk_type] += 1
-            metrics["risk_type_distribution"] = type_counts
+            level_counts = Counter()
+            entity_risk_counts = Counter()
+            risk_event_matrix = defaultdict(lambda: defaultdict(int))  # only observed pairs
+            time_distribution = {}
             
-            # Risk severity distribution
-            severity_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            for risk in risks:
-                if not hasattr(risk, 'severity'):
-                    continue
-                    
-                severity_counts[risk.severity] = severity_counts.get(risk.severity, 0) + 1
-            metrics["risk_severity_distribution"] = severity_counts
+            # Bind the hot lookups to locals for the loop
+            count_entities = entity_risk_counts.update
+            event_type_of = self._get_event_type_index().get
+            get_day_bucket = time_distribution.get
+            no_event_type = _NO_EVENT_TYPE
             
-            # Most affected entities
-            entity_risk_counts = {}
             for risk in risks:
-                if not hasattr(risk, 'entities') or not isinstance(risk.entities, list):
+                count_entities(risk.entities)
+                
+                level = _severity_level(risk.severity)
+                if level is not None:
+                    level_counts[level] += 1
+                
+                risk_type = risk.risk_type
+                if risk_type is None:
                     continue
+                type_counts[risk_type] = type_counts.get(risk_type, 0) + 1
+                
+                # Count correlations
+                if risk.events:
+                    type_row = risk_event_matrix[risk_type]
+                    for event_id in risk.events:
+                        event_type = event_type_of(event_id, no_event_type)
+                        if event_type is not no_event_type:
+                            type_row[event_type] += 1
+                
+                # Risk over time, bucketed by creation day
+                date_str = risk.created_day
+                if date_str is not None:
+                    day_bucket = get_day_bucket(date_str)
+                    if day_bucket is None:
+                        day_bucket = time_distribution[date_str] = {
+                            "total": 0,
+                            "by_type": {}
+                        }
                     
-                for entity_id in risk.entities:
-                    if entity_id not in entity_risk_counts:
-                        entity_risk_counts[entity_id] = 0
-                    entity_risk_counts[entity_id] += 1
+                    day_bucket["total"] += 1
+                    
+                    # Also track by type
+                    by_type = day_bucket["by_type"]
+                    by_type[risk_type] = by_type.get(risk_type, 0) + 1
+            
+            # Risk severity distribution; levels 1-5 are always present
+            severity_counts = {level: level_counts[level] for level in range(1, 6)}
+            for level in sorted(level_counts):
+                if level not in severity_counts:
+                    severity_counts[level] = level_counts[level]
+            
+            metrics["risk_type_distribution"] = type_counts
+            metrics["risk_severity_distribution"] = severity_counts
+            metrics["risk_event_correlation"] = {
+                risk_type: dict(type_row) for risk_type, type_row in risk_event_matrix.items()
+            }
+            metrics["risk_over_time"] = time_distribution
             
             # Get top 10 affected entities
-            top_entities = sorted(entity_risk_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+            top_entities = heapq.nlargest(10, entity_risk_counts.items(), key=operator.itemgetter(1))
             metrics["most_affected_entities"] = []
+            top_entity_map = self.data_store.get_entities([entity_id for entity_id, _ in top_entities])
             
             for entity_id, count in top_entities:
-                entity = self.data_store.get_entity(entity_id)
+                entity = top_entity_map.get(entity_id)
                 if entity and hasattr(entity, 'name') and hasattr(entity, 'type'):
                     metrics["most_affected_entities"].append({
                         "id": entity_id,
@@ -823,77 +1597,25 @@ class RiskAnalyzer:
             
             # Highest severity risks
             try:
-                high_severity_risks = sorted(risks, key=lambda r: (getattr(r, 'severity', 0), getattr(r, 'likelihood', 0)), reverse=True)[:10]
+                top_indices = _top_risk_indices(arrays.severity, arrays.likelihood, 10)
                 metrics["highest_severity_risks"] = []
                 
-                for risk in high_severity_risks:
-                    if not hasattr(risk, 'id') or not hasattr(risk, 'title') or not hasattr(risk, 'risk_type'):
+                for idx in top_indices.tolist():
+                    risk = risks[idx]
+                    if risk.id is None or risk.title is None or risk.risk_type is None:
                         continue
                         
                     metrics["highest_severity_risks"].append({
                         "id": risk.id,
                         "title": risk.title,
                         "type": risk.risk_type,
-                        "severity": getattr(risk, 'severity', 0),
-                        "likelihood": getattr(risk, 'likelihood', 0.0)
+                        "severity": max(int(arrays.severity[idx]), 0),
+                        "likelihood": risk.likelihood or 0.0
                     })
             except Exception as sort_error:
                 logger.warning(f"Error sorting risks by severity: {sort_error}")
                 metrics["highest_severity_risks"] = []
             
-            # Risk-event correlation
-            event_types = set()
-            for event in events:
-                if hasattr(event, 'event_type'):
-                    event_types.add(event.event_type)
-            
-            risk_event_matrix = {}
-            for risk_type in type_counts.keys():
-                risk_event_matrix[risk_type] = {}
-                for event_type in event_types:
-                    risk_event_matrix[risk_type][event_type] = 0
-            
-            # Count correlations
-            for risk in risks:
-                if not hasattr(risk, 'events') or not isinstance(risk.events, list) or not hasattr(risk, 'risk_type'):
-                    continue
-                    
-                for event_id in risk.events:
-                    event = self.data_store.get_event(event_id)
-                    if event and hasattr(event, 'event_type'):
-                        risk_event_matrix[risk.risk_type][event.event_type] = \
-                            risk_event_matrix[risk.risk_type].get(event.event_type, 0) + 1
-            
-            metrics["risk_event_correlation"] = risk_event_matrix
-            
-            # Risk over time
-            time_distribution = {}
-            
-            for risk in risks:
-                if not hasattr(risk, 'created_at') or not hasattr(risk, 'risk_type'):
-                    continue
-                    
-                try:
-                    # Use creation date
-                    date_str = datetime.fromisoformat(risk.created_at).strftime('%Y-%m-%d')
-                    
-                    if date_str not in time_distribution:
-                        time_distribution[date_str] = {
-                            "total": 0,
-                            "by_type": {}
-                        }
-                    
-                    time_distribution[date_str]["total"] += 1
-                    
-                    # Also track by type
-                    if risk.risk_type not in time_distribution[date_str]["by_type"]:
-                        time_distribution[date_str]["by_type"][risk.risk_type] = 0
-                    time_distribution[date_str]["by_type"][risk.risk_type] += 1
-                except Exception as date_error:
-                    logger.warning(f"Error processing date for risk {getattr(risk, 'id', 'unknown')}: {date_error}")
-            
-            metrics["risk_over_time"] = time_distribution
-            
             # Format data for template
             risk_categories = []
             for risk_type, count in type_counts.items():
@@ -920,6 +1642,8 @@ class RiskAnalyzer:
                 "entity_risk_exposure": metrics["most_affected_entities"]
             }
             
+            self._metrics_cache = simplified_metrics
+            self._metrics_cache_version = store_version
             return simplified_metrics
             
         except Exception as e: